@@ -0,0 +1,213 @@
+"""
+브라우저 없이 질의 묶음을 처리하는 배치 실행기
+
+JSONL 파일의 질의를 한 줄씩 읽어 Assistant.process_query로 분류/처리하고,
+선수 통계 질의(additional_input)에 시즌과 매치 타입이 주어지면 Assistant.search_stat까지,
+여러 선수 비교 질의(compare_stats)는 Assistant.search_stats_many까지 실행합니다.
+제한된 수의 작업 스레드가 캐시(메타데이터, YouTube, 질의 분류)를 공유하며,
+결과는 끝나는 대로 JSONL 파일에 한 줄씩 추가하므로 중단된 뒤 같은 명령으로 이어서 실행할 수 있습니다.
+(이어서 실행하면 성공한 id만 건너뛰고, 오류로 끝난 id는 다시 처리해 새 결과 줄을 추가합니다.)
+
+입력 한 줄 예:
+    {"id": "q1", "query": "손흥민 스탯 알려줘", "season": "ICON (ICON)", "match": "공식경기", "expected_action": "additional_input"}
+    (id가 없으면 줄 번호를 사용, season/match/expected_action은 선택)
+
+사용 예:
+    python batch.py queries.jsonl --output results.jsonl --workers 4
+    python batch.py queries.jsonl --output results.jsonl --chart-dir charts   # 통계 그래프 PNG도 저장
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterator, Set, Union
+
+import main
+
+
+def read_records(path: str) -> Iterator[dict]:
+    """
+    입력 JSONL 파일을 한 줄씩 읽습니다. (빈 줄은 건너뜀, id가 없으면 줄 번호를 사용)
+    """
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, str):
+                record = {"query": record}
+            record.setdefault("id", f"line-{number}")
+            yield record
+
+
+def completed_ids(path: str) -> Set[str]:
+    """
+    이전 실행에서 성공(status == "ok")한 결과를 쓴 id 목록
+    오류로 끝난 id(시간 초과, LLM 오류, 외부 API 장애)는 다시 처리하도록 넣지 않습니다. (중간에 끊겨 깨진 마지막 줄은 무시)
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+                if result.get("status") == "ok":
+                    done.add(str(result["id"]))
+            except (ValueError, KeyError, TypeError, AttributeError):
+                continue
+    return done
+
+
+class ResultWriter:
+    """
+    결과를 JSONL 파일에 한 줄씩 추가하는 스레드 안전 기록기 (줄마다 flush)
+    """
+
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        # 이전 실행이 줄 중간에 끊겼으면 줄바꿈을 먼저 넣어 다음 결과가 깨진 줄에 붙지 않게 함
+        needs_newline = False
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b"\n"
+        self._file = open(path, "a", encoding="utf-8")
+        if needs_newline:
+            self._file.write("\n")
+
+    def write(self, result: dict):
+        line = json.dumps(result, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def run_record(assistant: main.Assistant, record: dict, chart_dir: Union[str, None] = None) -> dict:
+    """
+    질의 하나를 처리하고 결과 레코드를 만듭니다.
+    """
+    started = time.perf_counter()
+    result = {"id": str(record["id"]), "query": record.get("query", "")}
+    try:
+        outcome = assistant.process_query(result["query"])
+        if not isinstance(outcome, tuple):
+            # process_query는 처리 중 오류가 나면 오류 메시지 문자열을 반환
+            result.update(status="error", error=outcome)
+            return result
+
+        action, response = outcome
+        result.update(status="ok", action=action)
+        if action in ("additional_input", "compare_stats"):
+            result["search_keyword"] = response
+            if record.get("season") and record.get("match"):
+                result.update(season=record["season"], match=record["match"])
+                seasonid_data = assistant.metadata.get(assistant.seasonid_url)
+                match_data = assistant.metadata.get(assistant.match_url)
+                if action == "compare_stats":
+                    stat = assistant.search_stats_many(
+                        main.player_names(response), record["season"], record["match"], seasonid_data, match_data)
+                else:
+                    stat = assistant.search_stat(response, record["season"], record["match"], seasonid_data, match_data)
+                if isinstance(stat, str):
+                    result["response"] = stat
+                else:
+                    result["response"] = stat.summary
+                    if chart_dir:
+                        chart_path = os.path.join(chart_dir, f"{result['id']}.png")
+                        with open(chart_path, "wb") as f:
+                            f.write(stat.png)
+                        result["chart"] = chart_path
+        elif action == "search_video" and response is None:
+            # search_videos는 YouTube API 장애 시 None을 반환하므로 다음 실행 때 다시 처리하도록 오류로 기록
+            result.update(status="error", error="YouTube 검색 실패")
+        else:
+            result["response"] = response
+    except Exception as e:
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+    finally:
+        result["seconds"] = round(time.perf_counter() - started, 4)
+        if record.get("expected_action") is not None:
+            result["expected_action"] = record["expected_action"]
+            result["match_expected"] = result.get("action") == record["expected_action"]
+    return result
+
+
+def run_batch(assistant: main.Assistant, records, output_path: str, workers: int = 4,
+              chart_dir: Union[str, None] = None, resume: bool = True) -> dict:
+    """
+    records를 최대 workers개씩 동시에 처리하며 결과를 output_path에 추가하고, 요약을 반환합니다.
+    resume이면 output_path에 이미 성공한 결과가 있는 id는 건너뜁니다. (오류로 끝난 id는 다시 처리)
+    """
+    if chart_dir:
+        os.makedirs(chart_dir, exist_ok=True)
+    done = completed_ids(output_path) if resume else set()
+    if not resume and os.path.exists(output_path):
+        os.remove(output_path)
+
+    summary = {"processed": 0, "skipped": 0, "errors": 0, "actions": Counter(), "mismatches": []}
+    writer = ResultWriter(output_path)
+    started = time.perf_counter()
+
+    def collect(future):
+        result = future.result()
+        writer.write(result)
+        summary["processed"] += 1
+        if result["status"] == "error":
+            summary["errors"] += 1
+        else:
+            summary["actions"][result["action"]] += 1
+        if result.get("match_expected") is False:
+            summary["mismatches"].append(
+                {"id": result["id"], "expected": result["expected_action"], "actual": result.get("action")})
+
+    # 입력을 한꺼번에 읽지 않도록 진행 중인 작업 수를 workers * 2개로 제한
+    workers = max(1, workers)
+    pending = set()
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as executor:
+            for record in records:
+                if str(record["id"]) in done:
+                    summary["skipped"] += 1
+                    continue
+                if len(pending) >= workers * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        collect(future)
+                pending.add(executor.submit(run_record, assistant, record, chart_dir))
+            for future in list(pending):
+                collect(future)
+                pending.discard(future)
+    finally:
+        writer.close()
+
+    summary["seconds"] = round(time.perf_counter() - started, 4)
+    summary["actions"] = dict(summary["actions"])
+    return summary
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="FC Online Chat Bot 배치 실행기")
+    parser.add_argument("input", help="질의 JSONL 파일")
+    parser.add_argument("--output", required=True, help="결과를 추가할 JSONL 파일")
+    parser.add_argument("--workers", type=int, default=4, help="동시에 처리할 질의 수")
+    parser.add_argument("--chart-dir", help="통계 그래프 PNG를 저장할 폴더")
+    parser.add_argument("--no-resume", action="store_true", help="이전 결과를 지우고 처음부터 실행")
+    args = parser.parse_args()
+
+    assistant = main.Assistant.shared()
+    summary = run_batch(assistant, read_records(args.input), args.output, args.workers,
+                        args.chart_dir, resume=not args.no_resume)
+    summary["metrics"] = main.metrics().snapshot()
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,489 @@
+"""
+오프라인 벤치마크
+
+Nexon / YouTube / OpenAI API를 흉내 내는 로컬 서버를 띄우고,
+Assistant.process_query와 Assistant.search_stat을 대표적인 질의 조합으로 실행해
+지연 시간(p50/p95/p99), 질의당 외부 호출 수, 세션당 메모리를 측정합니다.
+실제 API 키 없이 성능 변경 전후를 같은 기준으로 비교하기 위한 도구입니다.
+
+사용 예:
+    python bench.py --sessions 20 --queries-per-session 10 --latency 0.05 --output bench_output.txt
+    python bench.py --baseline bench_output.txt   # 이전 결과와 비교
+    python bench.py --route-latency chat.completions=0.8 --route-error-rate ranker-stats=0.2   # 경로별 설정
+"""
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Union
+from urllib.parse import parse_qs, urlparse
+
+import main
+
+
+# 질의에 사용하는 대표 선수 (그 외 선수는 spid 크기를 맞추기 위한 가상 선수)
+FAMOUS_PLAYERS = ["손흥민", "리오넬 메시", "호날두", "로날트 쿠만", "모하메드 살라", "킬리안 음바페"]
+SEASONS = [
+    {"seasonId": 101, "className": "ICON (ICON)"},
+    {"seasonId": 230, "className": "23 TOTY (23 Team of the Year)"},
+    {"seasonId": 300, "className": "LIVE (Live Performance)"},
+]
+MATCH_TYPES = [{"matchtype": 50, "desc": "공식경기"}, {"matchtype": 52, "desc": "감독모드"}]
+POSITIONS = [{"spposition": i, "desc": f"P{i}"} for i in range(29)]
+
+# 질의 조합: (종류, 질의)
+QUERY_MIXES = {
+    "stats": [
+        ("stat", "손흥민 스탯 알려줘"),
+        ("stat", "게임 내 메시 경기 평균 스탯은?"),
+        ("stat", "로날트쿠만 평균 스탯 알려줘"),
+        ("stat", "살라 경기 평균 통계 보여줘"),
+    ],
+    "video": [
+        ("video", "FC Online 메시 활용법 영상 추천해줘."),
+        ("video", "손흥민 활용법"),
+        ("video", "최신 전술 추천 영상 있어?"),
+        ("video", "피파 전술 추천 영상 있어?"),
+    ],
+    "compare": [
+        ("compare", "손흥민 vs 살라 스탯 비교"),
+        ("compare", "메시랑 호날두 평균 통계 비교해줘"),
+        ("compare", "음바페 살라 손흥민 경기력 비교"),
+    ],
+    "unsupported": [
+        ("other", "챔피언스리그 결과 알려줘."),
+        ("other", "피파"),
+        ("other", "오늘 날씨 어때?"),
+    ],
+}
+# 규칙 분류기와 질의 분류 캐시에 걸리지 않아 매번 LLM을 호출하는 질의 (비동기 파이프라인 연속 실행 확인용)
+LLM_QUERIES = ["주말에 볼 영화 추천해줘", "오늘 환율 알려줘", "어제 야구 경기 결과는?", "주식 시세 알려줘"]
+QUERY_MIXES["mixed"] = QUERY_MIXES["stats"] + QUERY_MIXES["video"] + QUERY_MIXES["unsupported"]
+
+
+class StubUpstream:
+    """
+    Nexon / YouTube / OpenAI API를 흉내 내는 로컬 HTTP 서버
+    기본 지연 시간과 오류 비율을 routes({경로: (지연 시간, 오류 비율)})로 경로별로 바꿀 수 있고, 호출 수와 응답 바이트 수를 셉니다.
+    실제 API처럼 HTTP/1.1 keep-alive로 응답하므로 클라이언트의 연결 재사용도 그대로 재현됩니다.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 spid_size: int = 50000, ranker_batch_limit: int = 20, seed: int = 0,
+                 routes: Union[Dict[str, tuple], None] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.routes = dict(routes or {})  # 경로 이름(호출 수를 세는 이름과 같음) -> (지연 시간, 오류 비율)
+        self.ranker_batch_limit = ranker_batch_limit
+        self.random = random.Random(seed)
+        self.calls: Dict[str, int] = {}
+        self.bytes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        # spid.json: 대표 선수 + 가상 선수 (시즌 id * 1,000,000 + 선수 번호)
+        self.spid = []
+        for i, name in enumerate(FAMOUS_PLAYERS):
+            for season in SEASONS[:2]:
+                self.spid.append({"id": season["seasonId"] * 1_000_000 + i + 1, "name": name})
+        for i in range(len(self.spid), spid_size):
+            season = SEASONS[i % len(SEASONS)]["seasonId"]
+            self.spid.append({"id": season * 1_000_000 + 1000 + i, "name": f"가상선수 {i}"})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self) -> "StubUpstream":
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.calls)
+
+    def _record(self, route: str, size: int):
+        with self._lock:
+            self.calls[route] = self.calls.get(route, 0) + 1
+            self.bytes[route] = self.bytes.get(route, 0) + size
+
+    def _delay(self, route: str):
+        latency = self.routes.get(route, (self.latency, self.error_rate))[0]
+        if latency or self.jitter:
+            time.sleep(max(0.0, latency + self.random.uniform(-self.jitter, self.jitter)))
+
+    def _failed(self, route: str) -> bool:
+        error_rate = self.routes.get(route, (self.latency, self.error_rate))[1]
+        return error_rate > 0 and self.random.random() < error_rate
+
+    def _ranker_stats(self, query: dict):
+        players = json.loads(query["players"][0])
+        if len(players) > self.ranker_batch_limit:
+            return 400, {"error": {"name": "OPENAPI00004", "message": "Please input valid parameter"}}
+        result = []
+        for player in players:
+            spid, position = int(player["id"]), int(player["po"])
+            if (spid + position) % 4 == 0:  # 일부 포지션은 데이터 없음
+                continue
+            base = (spid % 97) / 10 + position / 5
+            result.append({"spId": spid, "spPosition": position, "status": {
+                "shoot": base, "effectiveShoot": base / 2, "assist": base / 5, "goal": base / 4,
+                "dribble": base * 10, "dribbleTry": base, "dribbleSuccess": base * 0.7,
+                "passTry": base * 8, "passSuccess": base * 6, "block": base / 10, "tackle": base / 3,
+                "matchCount": 100 + spid % 1000 + position,
+            }})
+        return 200, result
+
+    def _youtube_search(self, query: dict):
+        count = int(query.get("maxResults", ["5"])[0])
+        page = int(query.get("pageToken", ["0"])[0])
+        keyword = query.get("q", [""])[0]
+        items = [{
+            "id": {"kind": "youtube#video", "videoId": f"{abs(hash(keyword)) % 10000}-{page}-{i}"},
+            "snippet": {"title": f"{keyword} #{i}", "channelTitle": "FC 채널", "publishedAt": "2024-05-01T12:00:00Z"},
+        } for i in range(count)]
+        return 200, {"items": items, "nextPageToken": str(page + 1)}
+
+    def _youtube_videos(self, query: dict):
+        ids = query["id"][0].split(",")
+        return 200, {"items": [{"id": video_id, "statistics": {
+            "viewCount": str(1000 + len(video_id) * 37), "likeCount": str(sum(map(ord, video_id)) % 500),
+        }} for video_id in ids]}
+
+    def _chat_completion(self, body: dict):
+        # 프롬프트 끝의 "분석할 질의"를 꺼내 간단한 규칙으로 분류한 JSON을 돌려줌
+        prompt = body["messages"][-1]["content"]
+        query = prompt.split("분석할 질의:")[-1].strip().split("\n")[0].strip()
+        players = [name.split()[-1] for name in FAMOUS_PLAYERS if name.split()[-1] in query]
+        player = players[0] if players else None
+        if len(players) > 1 and any(k in query for k in ("vs", "비교")):
+            action = {"action": "compare_stats", "action_input": query, "search_keyword": ", ".join(players)}
+        elif player and any(k in query for k in ("스탯", "통계", "평균", "경기력")):
+            action = {"action": "additional_input", "action_input": query, "search_keyword": player}
+        elif any(k in query for k in ("공략", "활용법", "영상", "전술")):
+            action = {"action": "search_video", "action_input": query, "search_keyword": f"FC Online {query}"}
+        else:
+            action = {"action": "not_supported", "action_input": query, "search_keyword": ""}
+        content = json.dumps(action, ensure_ascii=False)
+        prompt_tokens = len(prompt) // 2
+        message = {"role": "assistant", "content": content}
+        if body.get("tools"):
+            # 함수 호출(structured output) 요청이면 같은 결과를 도구 호출 인자로 돌려줌
+            name = body["tools"][0]["function"]["name"]
+            message = {"role": "assistant", "content": None, "tool_calls": [
+                {"id": "call_bench", "type": "function", "function": {"name": name, "arguments": content}}]}
+        return 200, {
+            "id": "chatcmpl-bench", "object": "chat.completion", "created": int(time.time()),
+            "model": body.get("model", "bench"),
+            "choices": [{"index": 0, "message": message,
+                         "finish_reason": "tool_calls" if body.get("tools") else "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 2,
+                      "total_tokens": prompt_tokens + len(content) // 2},
+        }
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # 응답마다 연결을 닫지 않고 keep-alive로 재사용
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, route: str, code: int, payload):
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(code)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+                stub._record(route, len(data))
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                name = url.path.rsplit("/", 1)[-1]
+                route = {"search": "youtube.search", "videos": "youtube.videos"}.get(name, name)
+                stub._delay(route)
+                if stub._failed(route):
+                    return self._send(route, 503, {"error": "stub failure"})
+                if name == "spid.json":
+                    return self._send(name, 200, stub.spid)
+                if name == "spposition.json":
+                    return self._send(name, 200, POSITIONS)
+                if name == "seasonid.json":
+                    return self._send(name, 200, SEASONS)
+                if name == "matchtype.json":
+                    return self._send(name, 200, MATCH_TYPES)
+                if name == "ranker-stats":
+                    return self._send(name, *stub._ranker_stats(query))
+                if name == "search":
+                    return self._send("youtube.search", *stub._youtube_search(query))
+                if name == "videos":
+                    return self._send("youtube.videos", *stub._youtube_videos(query))
+                self._send(name, 404, {"error": "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                stub._delay("chat.completions")
+                if stub._failed("chat.completions"):
+                    return self._send("chat.completions", 503, {"error": {"message": "stub failure"}})
+                if self.path.endswith("/chat/completions"):
+                    return self._send("chat.completions", *stub._chat_completion(body))
+                self._send(self.path, 404, {"error": "not found"})
+
+        return Handler
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def make_assistant(stub: StubUpstream, cache_dir: str) -> main.Assistant:
+    """
+    로컬 서버를 바라보는 Assistant를 만듭니다. 프로세스 전역 캐시는 시나리오마다 비웁니다.
+    """
+    main._process_registry.clear()
+    config = main.AssistantConfig(
+        youtube_api_key="bench", nexon_api_key="bench", openai_api_key="bench", llm_model="gpt-4o-mini",
+        metadata_cache_dir=f"{cache_dir}/metadata", intent_cache_path=f"{cache_dir}/intent_cache.json",
+        stats_store_path=f"{cache_dir}/stats.sqlite3",
+        nexon_api_base=stub.base_url, youtube_api_base=stub.base_url, openai_base_url=f"{stub.base_url}/v1",
+        nexon_rate_limit=0,  # 로컬 서버에는 속도 제한을 두지 않음
+    )
+    return main.Assistant(config)
+
+
+def run_session(assistant: main.Assistant, queries: List[tuple], rng: random.Random) -> List[dict]:
+    """
+    한 세션(대화)을 흉내 냅니다. 통계 질의는 시즌/매치를 골라 search_stat(비교 질의는 search_stats_many)까지 실행합니다.
+    """
+    records = []
+    messages = main.ChatHistory.for_session(assistant.config)  # main_()이 쌓는 대화 기록과 같은 형태
+    for kind, query in queries:
+        started = time.perf_counter()
+        result = assistant.process_query(query)
+        if isinstance(result, tuple) and result[0] == "additional_input":
+            season = rng.choice(SEASONS[:2])["className"]
+            chart = assistant.search_stat(result[1], season, MATCH_TYPES[0]["desc"], SEASONS, MATCH_TYPES)
+            if isinstance(chart, main.ChartArtifact):
+                messages.append(main.ChatMessage("assistant", kind="chart", chart=chart.png, summary=chart.summary))
+        elif isinstance(result, tuple) and result[0] == "compare_stats":
+            season = rng.choice(SEASONS[:2])["className"]
+            chart = assistant.search_stats_many(
+                main.player_names(result[1]), season, MATCH_TYPES[0]["desc"], SEASONS, MATCH_TYPES)
+            if isinstance(chart, main.ChartArtifact):
+                messages.append(main.ChatMessage("assistant", kind="chart", chart=chart.png, summary=chart.summary))
+        elif isinstance(result, tuple) and result[0] == "search_video":
+            messages.append(main.ChatMessage("assistant", kind="video", videos=result[1] or []))
+        messages.append(main.ChatMessage("user", content=query))
+        records.append({"kind": kind, "latency": time.perf_counter() - started})
+    return records
+
+
+def route_overrides(args) -> Dict[str, tuple]:
+    """
+    --route-latency / --route-error-rate ("경로=값") 옵션을 {경로: (지연 시간, 오류 비율)}로 바꿉니다.
+    한쪽만 지정한 경로는 다른 값에 전역 기본값(--latency, --error-rate)을 사용합니다.
+    """
+    def parse(values, option):
+        parsed = {}
+        for value in values or []:
+            route, sep, number = value.partition("=")
+            if not sep:
+                raise SystemExit(f"{option}는 경로=값 형식이어야 합니다: {value}")
+            parsed[route] = float(number)
+        return parsed
+
+    latency = parse(args.route_latency, "--route-latency")
+    error_rate = parse(args.route_error_rate, "--route-error-rate")
+    return {route: (latency.get(route, args.latency), error_rate.get(route, args.error_rate))
+            for route in set(latency) | set(error_rate)}
+
+
+def run_benchmark(args) -> dict:
+    stub = StubUpstream(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        spid_size=args.spid_size, seed=args.seed, routes=route_overrides(args)).start()
+    rng = random.Random(args.seed)
+    queries = QUERY_MIXES[args.mix]
+    report = {"config": vars(args).copy(), "phases": {}}
+    report["config"].pop("baseline", None)
+
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            # 1) 콜드 스타트: 메타데이터 다운로드와 인덱스 생성까지 포함
+            assistant = make_assistant(stub, cache_dir)
+            before = stub.snapshot()
+            started = time.perf_counter()
+            assistant.warm_up()
+            assistant.chain  # 백그라운드에서 만들던 LLM 체인이 준비될 때까지 포함
+            main.load_pyplot()
+            report["phases"]["warm_up"] = {
+                "seconds": round(time.perf_counter() - started, 4),
+                "upstream_calls": diff_calls(before, stub.snapshot()),
+            }
+
+            # 2) 세션 실행: 세션마다 질의를 섞어 동시에 실행
+            sessions = [[rng.choice(queries) for _ in range(args.queries_per_session)] for _ in range(args.sessions)]
+            before = stub.snapshot()
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+                results = list(pool.map(lambda s: run_session(assistant, s, random.Random(rng.random())), sessions))
+            elapsed = time.perf_counter() - started
+            calls = diff_calls(before, stub.snapshot())
+
+            # 3) 메모리: tracemalloc은 실행을 크게 느리게 하므로 따로 한 세션씩 측정
+            memory_per_session, memory_peak = measure_session_memory(
+                assistant, sessions[:args.memory_sessions], random.Random(args.seed))
+
+            records = [record for session in results for record in session]
+            total_queries = len(records)
+            report["phases"]["sessions"] = {
+                "queries": total_queries,
+                "seconds": round(elapsed, 4),
+                "throughput_qps": round(total_queries / elapsed, 2) if elapsed else 0.0,
+                "latency_ms": latency_summary([r["latency"] for r in records]),
+                "latency_ms_by_kind": {
+                    kind: latency_summary([r["latency"] for r in records if r["kind"] == kind])
+                    for kind in sorted({r["kind"] for r in records})
+                },
+                "upstream_calls": calls,
+                "upstream_calls_per_query": {k: round(v / total_queries, 3) for k, v in calls.items()},
+                "memory_per_session_kb": round(memory_per_session / 1024, 1),
+                "memory_peak_kb": round(memory_peak / 1024, 1),
+                "youtube_quota": assistant.youtube_cache.ledger.report(),
+                "router_hit_rate": round(assistant.router.hit_rate, 3),
+                "stages": main.metrics().snapshot()["spans"],
+            }
+            # 4) 비동기 파이프라인: 화면(run_query)과 같은 공유 이벤트 루프에서 LLM 분류 질의를 연달아 실행
+            #    (비동기 LLM 클라이언트의 keep-alive 연결이 질의 사이에 재사용돼도 실패하지 않는지 확인)
+            report["phases"]["async_pipeline"] = run_async_queries(assistant, LLM_QUERIES)
+            report["startup_timings"] = dict(main.startup_timings())
+            assistant.intent_cache.flush()  # 임시 폴더를 지우기 전에 예약된 저장을 마침
+    finally:
+        stub.stop()
+    return report
+
+
+def run_async_queries(assistant: main.Assistant, queries: List[str]) -> dict:
+    """
+    질의를 하나씩 차례로 Assistant.aprocess_query로 실행하고, 실패한 질의와 지연 시간을 정리합니다.
+    """
+    latencies = []
+    errors = []
+    loop = main.BackgroundLoop.shared()
+    for query in queries:
+        started = time.perf_counter()
+        result = loop.run(assistant.aprocess_query(query))
+        latencies.append(time.perf_counter() - started)
+        if not isinstance(result, tuple):
+            errors.append({"query": query, "error": result})
+    return {"queries": len(queries), "errors": errors, "latency_ms": latency_summary(latencies)}
+
+
+def measure_session_memory(assistant: main.Assistant, sessions: List[list], rng: random.Random):
+    """
+    세션을 하나씩 실행하며 실행 후 남아 있는 메모리(대화 기록, 캐시 증가분)의 평균과 최대 사용량을 잽니다.
+    """
+    retained = []
+    peak = 0
+    for session in sessions:
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        history = run_session(assistant, session, rng)
+        after, session_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        retained.append(after - before)
+        peak = max(peak, session_peak)
+        del history
+    return (statistics.fmean(retained) if retained else 0.0), peak
+
+
+def diff_calls(before: Dict[str, int], after: Dict[str, int]) -> Dict[str, int]:
+    return {k: after[k] - before.get(k, 0) for k in sorted(after) if after[k] - before.get(k, 0)}
+
+
+def latency_summary(values: List[float]) -> dict:
+    ms = [v * 1000 for v in values]
+    return {
+        "p50": round(percentile(ms, 50), 2),
+        "p95": round(percentile(ms, 95), 2),
+        "p99": round(percentile(ms, 99), 2),
+        "mean": round(statistics.fmean(ms), 2) if ms else 0.0,
+    }
+
+
+def compare(report: dict, baseline: dict) -> List[str]:
+    """
+    기준 결과 대비 주요 지표 변화율을 정리합니다.
+    """
+    lines = []
+    current, base = report["phases"]["sessions"], baseline["phases"]["sessions"]
+    for key in ("p50", "p95", "p99"):
+        lines.append(change_line(f"latency {key} (ms)", base["latency_ms"][key], current["latency_ms"][key]))
+    for route in sorted(set(base["upstream_calls_per_query"]) | set(current["upstream_calls_per_query"])):
+        lines.append(change_line(f"calls/query {route}", base["upstream_calls_per_query"].get(route, 0),
+                                 current["upstream_calls_per_query"].get(route, 0)))
+    lines.append(change_line("memory/session (KB)", base["memory_per_session_kb"], current["memory_per_session_kb"]))
+    return lines
+
+
+def change_line(name: str, before: float, after: float) -> str:
+    delta = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+    return f"{name:<36} {before:>10} -> {after:>10} ({delta})"
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="FC Online Chat Bot 오프라인 벤치마크")
+    parser.add_argument("--mix", choices=sorted(QUERY_MIXES), default="mixed", help="질의 조합")
+    parser.add_argument("--sessions", type=int, default=8, help="세션(대화) 수")
+    parser.add_argument("--queries-per-session", type=int, default=10, help="세션당 질의 수")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 실행할 세션 수")
+    parser.add_argument("--memory-sessions", type=int, default=2, help="메모리를 측정할 세션 수")
+    parser.add_argument("--latency", type=float, default=0.02, help="로컬 서버 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="응답 지연 흔들림(초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="로컬 서버 오류 응답 비율 (0~1)")
+    parser.add_argument("--route-latency", action="append", metavar="ROUTE=SECONDS",
+                        help="경로별 응답 지연 (예: chat.completions=0.8, ranker-stats=0.1, 여러 번 지정 가능)")
+    parser.add_argument("--route-error-rate", action="append", metavar="ROUTE=RATE",
+                        help="경로별 오류 응답 비율 (예: ranker-stats=0.2, 여러 번 지정 가능)")
+    parser.add_argument("--spid-size", type=int, default=50000, help="spid.json 선수 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="결과 JSON을 저장할 파일")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON 파일")
+    args = parser.parse_args()
+
+    report = run_benchmark(args)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print("\n## 기준 결과 대비")
+        print("\n".join(compare(report, baseline)))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,113 @@
+"""
+선수 통계 수집 작업
+
+설정한 선수/시즌/매치 타입의 ranker-stats를 미리 조회해 로컬 통계 저장소(STATS_STORE_PATH)에 채웁니다.
+저장소에 충분히 최근 데이터가 있는 (spid, 매치 타입)은 건너뛰므로 주기적으로 실행하면 증분 갱신이 됩니다.
+이후 search_stat은 저장소 데이터가 STATS_STORE_TTL 안이면 Nexon API를 호출하지 않고 바로 답합니다.
+
+사용 예:
+    python ingest.py --players 손흥민 메시 --matches 공식경기
+    python ingest.py --players-file players.txt --seasons "ICON (ICON)" --max-age 43200
+"""
+import argparse
+import json
+import time
+from typing import List, Union
+
+import main
+
+
+def resolve(entries: List[dict], names: Union[List[str], None], name_key: str, id_key: str) -> List[int]:
+    """
+    메타데이터 표시 이름 목록을 id 목록으로 바꿉니다. (names가 없으면 전체)
+    """
+    by_name = {entry[name_key]: entry[id_key] for entry in entries if entry.get(name_key)}
+    if not names:
+        return list(by_name.values())
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise SystemExit(f"알 수 없는 이름: {', '.join(unknown)}")
+    return [by_name[name] for name in names]
+
+
+def ingest(assistant: main.Assistant, players: List[str], season_ids: Union[List[int], None],
+           matches: List[int], max_age: float, chunk_size: int = 20) -> dict:
+    """
+    선수 이름별로 (시즌이 지정되면 해당 시즌의) 모든 spid를 찾아, 매치 타입마다 오래된 통계만 다시 수집합니다.
+    """
+    started = time.perf_counter()
+    index = assistant.player_index()
+    positions = [position["spposition"] for position in assistant.metadata.get(assistant.position_url)]
+
+    spids = []
+    not_found = []
+    ambiguous = {}
+    for name in players:
+        ambiguous_names = index.ambiguous(name)
+        if ambiguous_names:
+            # 여러 선수와 일치하는 이름은 다른 선수의 카드를 섞지 않도록 건너뜀
+            ambiguous[name] = ambiguous_names
+            continue
+        seasons = index.seasons(name)
+        found = [spid for season_id, ids in seasons.items()
+                 if season_ids is None or season_id in season_ids for spid in ids]
+        if not found:
+            not_found.append(name)
+        spids.extend(found)
+    spids = list(dict.fromkeys(spids))  # 여러 이름에 걸린 같은 카드는 한 번만
+
+    fresh = assistant.stats_store.fresh_keys(max_age)
+    report = {"spids": len(spids), "not_found": not_found, "ambiguous": ambiguous, "fetched": 0, "skipped": 0, "empty": 0, "failed": 0}
+    for match in matches:
+        stale = [spid for spid in spids if (spid, match) not in fresh]
+        report["skipped"] += len(spids) - len(stale)
+        # 나눠서 조회해 중간에 끊겨도 끝난 묶음은 저장소에 남게 함
+        for i in range(0, len(stale), max(1, chunk_size)):
+            chunk = stale[i:i + max(1, chunk_size)]
+            try:
+                results = assistant.load_ranker_stats(chunk, match, positions, max_age=0)
+            except main.UpstreamDegraded as e:
+                # 장애 중인 묶음은 저장하지 않고 다음 실행 때 다시 수집
+                report["failed"] += len(chunk)
+                report.setdefault("errors", []).append(str(e))
+                continue
+            report["fetched"] += len(chunk)
+            report["empty"] += sum(1 for spid in chunk if not results.get(spid))
+
+    report["seconds"] = round(time.perf_counter() - started, 4)
+    return report
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="FC Online 선수 통계 수집 작업")
+    parser.add_argument("--players", nargs="*", default=[], help="수집할 선수 이름")
+    parser.add_argument("--players-file", help="한 줄에 선수 이름 하나씩 적은 파일")
+    parser.add_argument("--seasons", nargs="*", help="시즌 표시 이름 (기본: 선수의 모든 시즌)")
+    parser.add_argument("--matches", nargs="*", help="매치 타입 표시 이름 (기본: 모든 매치 타입)")
+    parser.add_argument("--max-age", type=float, help="이 시간(초) 안에 수집한 통계는 건너뜀 (기본: STATS_STORE_TTL)")
+    parser.add_argument("--chunk-size", type=int, default=20, help="한 번에 조회해 저장할 spid 수")
+    args = parser.parse_args()
+
+    players = list(args.players)
+    if args.players_file:
+        with open(args.players_file, encoding="utf-8") as f:
+            players.extend(line.strip() for line in f if line.strip())
+    if not players:
+        parser.error("--players 또는 --players-file이 필요합니다.")
+
+    assistant = main.Assistant.from_env()
+    if assistant.stats_store is None:
+        parser.error("STATS_STORE_PATH가 비어 있어 저장소를 사용할 수 없습니다.")
+
+    season_ids = None
+    if args.seasons:
+        season_ids = resolve(assistant.metadata.get(assistant.seasonid_url), args.seasons, "className", "seasonId")
+    matches = resolve(assistant.metadata.get(assistant.match_url), args.matches, "desc", "matchtype")
+    max_age = assistant.config.stats_store_ttl if args.max_age is None else args.max_age
+
+    report = ingest(assistant, players, season_ids, matches, max_age, args.chunk_size)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,75 +1,1660 @@
-# LangChain 관련: LLM과 프롬프트 처리를 위한 라이브러리
-from langchain_core.prompts import PromptTemplate  # 프롬프트 템플릿을 생성하고 관리하기 위한 클래스
-from langchain_openai import ChatOpenAI  # OpenAI의 GPT 모델을 사용하기 위한 인터페이스
-from langchain_core.tools import Tool  # 외부 도구나 API를 통합하기 위한 기본 클래스
-from langchain_core.runnables import RunnableSequence  # 여러 컴포넌트를 순차적으로 실행하기 위한 클래스
-# LLM의 출력을 JSON 형식으로 파싱하는 도구
-from langchain_core.output_parsers import JsonOutputParser
-import requests
+import time  # 시작 시간 측정 및 캐시 TTL 계산을 위한 라이브러리
+
+_MODULE_STARTED = time.perf_counter()  # 모듈 로드 시작 시각 (시작 시간 측정용)
+
+# LangChain, Pydantic, Matplotlib, NumPy 같은 무거운 라이브러리는
+# 질의 분류(LLM)나 선수 통계 경로에서 처음 사용할 때 불러옵니다. (_lazy_import 참고)
+import requests  # HTTP 요청 처리를 위한 라이브러리
 import json
+import asyncio  # 비동기 질의 처리 파이프라인
+import contextvars  # 백그라운드 이벤트 루프에서 실행하는 질의에 Streamlit 실행 컨텍스트 전달
+import queue  # 백그라운드 이벤트 루프의 단계별 결과를 화면 스레드로 전달
+import threading  # 프로세스 전역 캐시를 여러 세션이 동시에 사용할 때를 위한 락
+import random  # 재시도 대기 시간에 흔들림(jitter)을 주기 위한 난수
+import bisect  # 정렬된 선수 이름 목록에서 부분 일치 검색을 위한 이분 탐색
+import unicodedata  # 한글 자모 분해(NFD)를 이용한 이름 정규화
+import importlib
+import sys
+import sqlite3  # 선수 통계 저장소 (로컬 SQLite)
+import atexit  # 종료 전에 아직 저장하지 않은 질의 분류 캐시를 디스크에 기록
+import logging  # 디버깅용 출력(print) 대신 사용하는 로거
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # 계측 지표 엔드포인트
+import uuid  # 세션별 대화 기록 파일 이름
+from collections import Counter, OrderedDict, deque  # LRU 캐시 구현을 위한 순서 있는 딕셔너리
+from concurrent.futures import Future, ThreadPoolExecutor  # 포지션별 API 요청을 동시에 보내기 위한 스레드 풀
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter  # keep-alive 연결 풀 크기 설정
+
+# 파이썬 타입 힌팅을 위한 임포트
+# 타입 힌팅은 코드의 가독성을 높이고 IDE의 자동완성 기능을 개선합니다
+from typing import List, Union, Any, Dict, Literal, Tuple  # 다양한 타입 힌팅 클래스들
+
+# 유틸리티 라이브러리들
+from datetime import datetime  # 날짜와 시간 처리를 위한 클래스
+from dataclasses import dataclass  # 데이터 클래스 생성을 위한 데코레이터
+import io  # 그래프를 PNG 바이트로 저장하기 위한 버퍼
+import warnings
+import re  # 정규 표현식 처리를 위한 라이브러리
+import os  # 운영체제 관련 기능과 환경 변수 접근을 위한 라이브러리
+from dotenv import load_dotenv  # .env 파일에서 환경 변수를 로드하기 위한 라이브러리
+
+# streamlit 모듈
+import streamlit as st
+
+logger = logging.getLogger("fc_online_chatbot")
+
+
+@dataclass
+class AssistantConfig:
+    """
+    Assistant의 설정을 관리하는 데이터 클래스
+    데이터클래스는 설정값을 깔끔하게 관리하고 타입 검사를 제공합니다.
+    
+    Attributes:
+        youtube_api_key (str): YouTube Data API 접근을 위한 인증 키
+        llm_model (str): 사용할 언어 모델의 이름 (예: gpt-4)
+        temperature (float): 언어 모델의 창의성 조절 파라미터 (0.0 = 결정적, 1.0 = 창의적)
+        metadata_cache_dir (str): Nexon 메타데이터를 디스크에 저장할 디렉터리
+        metadata_ttl (float): 메타데이터를 재검증 없이 사용할 수 있는 시간(초)
+        nexon_concurrency (int): Nexon API 동시 요청 수 상한
+        nexon_rate_limit (float): Nexon API 키당 초당 요청 수 상한 (토큰 버킷 충전 속도)
+        nexon_rate_burst (int): 토큰 버킷 최대 용량 (순간적으로 허용되는 요청 수)
+        ranker_batch_size (int): ranker-stats 한 번의 호출에 담을 (spid, 포지션) 쌍의 최대 개수
+        youtube_search_ttl (float): YouTube 검색 결과 캐시 유지 시간(초)
+        youtube_stats_ttl (float): YouTube 조회수/좋아요 통계 캐시 유지 시간(초)
+        youtube_cache_size (int): YouTube 캐시에 보관할 최대 항목 수 (LRU 방식으로 제거)
+        intent_cache_path (str): 질의 분류 결과 캐시를 저장할 파일 경로
+        intent_cache_size (int): 질의 분류 결과 캐시 최대 항목 수
+        intent_cache_ttl (float): 질의 분류 결과 캐시 유지 시간(초)
+        intent_similarity_threshold (float): 임베딩 유사도 재사용 기준 (0이면 사용하지 않음)
+        llm_timeout (float): 비동기 파이프라인의 LLM 분류 단계 제한 시간(초)
+        video_timeout (float): 비동기 파이프라인의 YouTube 검색 단계 제한 시간(초)
+        query_deadline (float): 질의 하나의 전체 처리 제한 시간(초)
+        llm_hedge_delay (float): LLM 응답이 이 시간(초) 안에 없으면 같은 요청을 한 번 더 보냄 (0이면 사용하지 않음)
+        max_chart_artifacts (int): 한 세션의 대화 기록에 이미지로 보관할 그래프 최대 개수
+        nexon_api_base (str): Nexon Open API 기본 주소 (벤치마크 등에서 로컬 서버로 바꿀 때 사용)
+        youtube_api_base (str): YouTube Data API 기본 주소
+        openai_base_url (str): OpenAI 호환 API 주소 (None이면 기본값 사용)
+        stats_store_path (str): 선수 통계 저장소(SQLite) 파일 경로 (빈 값이면 사용하지 않음)
+        stats_store_ttl (float): 저장소의 통계를 실시간 조회 없이 사용할 수 있는 시간(초)
+        http_timeout (float): 외부 API 요청 하나의 제한 시간(초)
+        http_retries (int): 429/5xx/연결 오류 재시도 횟수
+        http_backoff (float): 재시도 대기 시간 기준(초), 재시도마다 두 배로 늘어나며 무작위로 흔들림
+        circuit_breaker_threshold (int): 호스트별 회로 차단기를 여는 연속 실패 횟수 (0이면 사용하지 않음)
+        circuit_breaker_cooldown (float): 회로 차단기가 열린 뒤 다시 시도하기까지의 시간(초)
+        prefetch_concurrency (int): 시즌/매치 선택 중 미리 조회에 쓰는 최대 동시 실행 수 (0이면 사용하지 않음)
+        prefetch_budget (int): 선수 이름(또는 시즌) 하나당 미리 조회할 최대 (spid, 매치 타입) 수
+        max_history_messages (int): 세션당 화면에 보관할 최근 대화 메시지 수
+        history_spill_dir (str): 보관 수를 넘은 오래된 메시지를 세션별 JSONL로 옮길 폴더 (빈 값이면 버림)
+        prompt_examples (int): 분류 프롬프트에 넣을 예시 수
+        prompt_token_budget (int): 분류 프롬프트의 최대 토큰 수 (넘으면 덜 비슷한 예시부터 뺌)
+        prompt_selector (str): 예시 선택 방식 ("lexical": 글자 유사도, "embedding": 임베딩 유사도)
+        structured_output (bool): JSON 문자열 파싱 대신 함수 호출(tool calling)로 AgentAction을 받을지 여부
+        metrics_port (int): 계측 지표(Prometheus 텍스트/JSON) 엔드포인트 포트 (0이면 사용하지 않음)
+        metrics_host (str): 계측 지표 엔드포인트를 열 주소 (인증이 없으므로 기본은 로컬에서만 접근)
+        debug_panel (bool): 화면 사이드바에 계측 지표 디버그 패널 표시 여부
+        not_supported_message (str): FC Online 게임 관련이 아닌 질문에 대한 기본 응답 메시지
+    """
+    youtube_api_key: str
+    nexon_api_key: str
+    openai_api_key : str
+    llm_model: str
+    temperature: float = 0.0
+    metadata_cache_dir: str = ".cache/metadata"  # 메타데이터 디스크 캐시 경로
+    metadata_ttl: float = 6 * 60 * 60  # 메타데이터 재검증 주기(초)
+    nexon_concurrency: int = 8
+    nexon_rate_limit: float = 5.0
+    nexon_rate_burst: int = 5
+    ranker_batch_size: int = 20
+    youtube_search_ttl: float = 6 * 60 * 60
+    youtube_stats_ttl: float = 30 * 60
+    youtube_cache_size: int = 1024
+    intent_cache_path: str = ".cache/intent_cache.json"
+    intent_cache_size: int = 4096
+    intent_cache_ttl: float = 7 * 24 * 60 * 60
+    intent_similarity_threshold: float = 0.0
+    llm_timeout: float = 20.0
+    video_timeout: float = 10.0
+    query_deadline: float = 30.0
+    llm_hedge_delay: float = 0.0
+    max_chart_artifacts: int = 10
+    nexon_api_base: str = "https://open.api.nexon.com"
+    youtube_api_base: str = "https://www.googleapis.com/youtube/v3"
+    openai_base_url: Union[str, None] = None
+    stats_store_path: str = ".cache/stats.sqlite3"
+    stats_store_ttl: float = 24 * 60 * 60
+    http_timeout: float = 10.0
+    http_retries: int = 2
+    http_backoff: float = 0.2
+    circuit_breaker_threshold: int = 5
+    circuit_breaker_cooldown: float = 30.0
+    prefetch_concurrency: int = 2
+    prefetch_budget: int = 6
+    max_history_messages: int = 50
+    history_spill_dir: str = ""
+    prompt_examples: int = 5
+    prompt_token_budget: int = 800
+    prompt_selector: str = "lexical"
+    structured_output: bool = False
+    metrics_port: int = 0
+    metrics_host: str = "127.0.0.1"
+    debug_panel: bool = False
+    not_supported_message: str = "😭 죄송합니다. FC Online 게임 관련 영상만 제공할 수 있습니다.⚽"
+
+
+@st.cache_resource
+def _process_registry() -> dict:
+    """
+    프로세스 전역 객체 보관소
+    Streamlit은 상호작용마다 스크립트를 다시 실행해서 클래스 속성도 새로 만들어지므로,
+    재실행 사이에도 유지되는 st.cache_resource에 공유 객체를 보관합니다.
+    """
+    return {"lock": threading.RLock(), "objects": {}}
+
+
+def process_singleton(key, factory):
+    """
+    key별로 factory()를 프로세스에서 한 번만 호출해 만든 객체를 반환합니다.
+    """
+    registry = _process_registry()
+    objects = registry["objects"]
+    if key not in objects:
+        with registry["lock"]:
+            if key not in objects:
+                objects[key] = factory()
+    return objects[key]
+
+
+class BackgroundLoop:
+    """
+    프로세스 전체가 함께 쓰는 asyncio 이벤트 루프 (백그라운드 스레드에서 계속 실행)
+    비동기 LLM 클라이언트의 keep-alive 연결은 처음 사용한 루프에 묶이므로,
+    질의마다 asyncio.run으로 새 루프를 만들지 않고 모든 비동기 질의를 이 루프에서 실행합니다.
+    """
+
+    @classmethod
+    def shared(cls) -> "BackgroundLoop":
+        return process_singleton("BackgroundLoop", cls)
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True, name="asyncio-loop").start()
+
+    def submit(self, coro) -> Future:
+        """
+        코루틴을 루프에 예약하고 concurrent.futures.Future를 반환합니다.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: Union[float, None] = None):
+        """
+        코루틴을 루프에서 실행하고 끝날 때까지 기다려 결과를 반환합니다.
+        """
+        return self.submit(coro).result(timeout)
+
+
+def script_run_ctx_var() -> contextvars.ContextVar:
+    """
+    백그라운드 루프에서 실행 중인 질의가 속한 Streamlit 실행 컨텍스트
+    (재실행마다 모듈이 다시 실행되어도 같은 변수를 쓰도록 프로세스 전역으로 보관)
+    """
+    return process_singleton("script_run_ctx", lambda: contextvars.ContextVar("script_run_ctx", default=None))
+
+
+class Metrics:
+    """
+    처리 단계별 소요 시간, 외부 API 호출/바이트 수, LLM 토큰 사용량, 캐시 적중률을 모으는 계측기
+    JSON(snapshot)이나 Prometheus 텍스트 형식(prometheus)으로 내보낼 수 있습니다.
+    """
+
+    # 단계별 소요 시간 히스토그램 구간(초)
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans: Dict[str, dict] = {}  # 단계 -> {count, sum, max, buckets}
+        self._counters: Dict[tuple, float] = {}  # (이름, 라벨) -> 누적 값
+        self._gauges: Dict[tuple, Any] = {}  # (이름, 라벨) -> 값을 돌려주는 함수 (내보낼 때 계산)
+
+    @contextmanager
+    def span(self, stage: str):
+        """
+        with 블록의 실행 시간을 stage 이름으로 기록합니다.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            span = self._spans.setdefault(stage, {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(self.BUCKETS)})
+            span["count"] += 1
+            span["sum"] += seconds
+            span["max"] = max(span["max"], seconds)
+            for i, bound in enumerate(self.BUCKETS):
+                if seconds <= bound:
+                    span["buckets"][i] += 1
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def register_gauge(self, name: str, fn, **labels):
+        """
+        내보낼 때마다 fn()을 호출해 값을 읽는 지표를 등록합니다. (캐시 적중률 등)
+        """
+        with self._lock:
+            self._gauges[(name, tuple(sorted(labels.items())))] = fn
+
+    def _gauge_values(self) -> List[tuple]:
+        with self._lock:
+            gauges = list(self._gauges.items())
+        values = []
+        for key, fn in gauges:
+            try:
+                values.append((key, float(fn())))
+            except Exception:
+                continue
+        return values
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            spans = {stage: {"count": s["count"], "sum_seconds": round(s["sum"], 4), "max_seconds": round(s["max"], 4),
+                             "mean_seconds": round(s["sum"] / s["count"], 4) if s["count"] else 0.0}
+                     for stage, s in self._spans.items()}
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+        gauges = [{"name": name, "labels": dict(labels), "value": value} for (name, labels), value in self._gauge_values()]
+        return {"spans": spans, "counters": counters, "gauges": gauges, "startup_timings": dict(startup_timings())}
+
+    def prometheus(self) -> str:
+        def label_text(labels) -> str:
+            if not labels:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+        lines = ["# TYPE fcbot_stage_seconds histogram"]
+        with self._lock:
+            for stage, s in sorted(self._spans.items()):
+                for bound, count in zip(self.BUCKETS, s["buckets"]):
+                    lines.append(f'fcbot_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+                lines.append(f'fcbot_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {s["count"]}')
+                lines.append(f'fcbot_stage_seconds_sum{{stage="{stage}"}} {s["sum"]}')
+                lines.append(f'fcbot_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+            counters = sorted(self._counters.items())
+        for (name, labels), value in counters:
+            lines.append(f"fcbot_{name}{label_text(labels)} {value}")
+        for (name, labels), value in sorted(self._gauge_values()):
+            lines.append(f"fcbot_{name}{label_text(labels)} {value}")
+        for name, seconds in sorted(startup_timings().items()):
+            lines.append(f'fcbot_startup_seconds{{step="{name}"}} {seconds}')
+        return "\n".join(lines) + "\n"
+
+
+def metrics() -> Metrics:
+    """
+    프로세스 전역 계측기
+    """
+    return process_singleton("Metrics", Metrics)
+
+
+def cache_hit_ratio(cache: "TTLCache") -> float:
+    total = cache.hits + cache.misses
+    return cache.hits / total if total else 0.0
+
+
+def token_usage_handler():
+    """
+    LLM 응답의 토큰 사용량(prompt/completion)을 계측기에 더하는 LangChain 콜백
+    """
+    BaseCallbackHandler = _lazy_import("langchain_core.callbacks").BaseCallbackHandler
+
+    class TokenUsageHandler(BaseCallbackHandler):
+        def on_llm_end(self, response, **kwargs):
+            usage = (response.llm_output or {}).get("token_usage") or {}
+            for kind in ("prompt_tokens", "completion_tokens"):
+                if usage.get(kind):
+                    metrics().inc("llm_tokens_total", usage[kind], kind=kind.split("_")[0])
+            metrics().inc("llm_calls_total")
+
+    return TokenUsageHandler()
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1"):
+    """
+    /metrics(Prometheus 텍스트)와 /metrics.json(JSON)을 제공하는 엔드포인트를 프로세스당 한 번 띄웁니다.
+    인증이 없으므로 기본은 로컬(127.0.0.1)에서만 받고, 다른 주소는 host로 명시해야 엽니다.
+    """
+    def create():
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.startswith("/metrics.json"):
+                    body = json.dumps(metrics().snapshot(), ensure_ascii=False).encode("utf-8")
+                    content_type = "application/json"
+                elif self.path.startswith("/metrics"):
+                    body = metrics().prometheus().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4"
+                else:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+        logger.info("계측 지표 엔드포인트: http://%s:%d/metrics", host, port)
+        return server
+
+    return process_singleton(("MetricsServer", host, port), create)
+
+
+def startup_timings() -> Dict[str, float]:
+    """
+    프로세스 시작 후 처음 측정한 모듈 로드/라이브러리 import/초기화 시간(초)
+    """
+    return process_singleton("StartupTimings", dict)
+
+
+def record_startup_timing(name: str, seconds: float):
+    # Streamlit 재실행 때 값이 덮어써지지 않도록 처음(콜드 스타트) 값만 보관
+    startup_timings().setdefault(name, round(seconds, 4))
+
+
+def _lazy_import(name: str):
+    """
+    무거운 라이브러리를 처음 사용할 때 불러오고, 그때 걸린 시간을 기록합니다.
+    """
+    # 다른 스레드가 불러오는 중일 수 있으므로 항상 import_module을 거쳐 초기화 완료를 기다림
+    first = name not in sys.modules
+    started = time.perf_counter()
+    module = importlib.import_module(name)
+    if first:
+        record_startup_timing(f"import:{name}", time.perf_counter() - started)
+    return module
+
+
+def load_pyplot():
+    """
+    matplotlib.pyplot을 불러오고 한글 폰트를 한 번만 설정합니다.
+    """
+    plt = _lazy_import("matplotlib.pyplot")
+    if "Malgun Gothic" not in plt.rcParams["font.family"]:
+        # 한글 폰트 설정 (Windows에서 Malgun Gothic 사용)
+        plt.rc('font', family='Malgun Gothic')
+    return plt
+
+
+def agent_action_model():
+    """
+    AgentAction 모델 클래스를 반환합니다. (Pydantic은 처음 호출될 때 불러옴)
+    """
+    return process_singleton("AgentAction", _define_agent_action)
+
+
+def _define_agent_action():
+    _lazy_import("pydantic")
+    from pydantic import BaseModel, Field  # 데이터 검증과 직렬화를 위한 Pydantic 라이브러리
+
+    class AgentAction(BaseModel):
+        """
+        에이전트의 행동을 정의하는 Pydantic 모델
+        Pydantic은 데이터 검증 및 관리를 위한 라이브러리입니다.
+        """
+        # Literal을 사용하여 action 필드가 가질 수 있는 값을 제한합니다
+        action: Literal["additional_input", "compare_stats", "search_video", "not_supported"] = Field(
+            description="에이전트가 수행할 행동의 타입을 지정합니다",
+        )
+
+        action_input: str = Field(
+            description="사용자가 입력한 원본 질의 텍스트입니다",
+            min_length=1,  # 최소 1글자 이상이어야 함
+        )
+
+        search_keyword: str = Field(
+            description="""검색에 사용할 최적화된 키워드입니다.
+            특정 선수 평균 통계 관련 키워드일 경우 선수 이름을 포함하고,
+            여러 선수 통계 비교(compare_stats)일 경우 선수 이름들을 쉼표(,)로 구분해 포함하고,
+            이외의 경우 핵심 검색어를 포함,
+            not_supported 액션의 경우 빈 문자열('')을 사용합니다""",
+            examples=["FC Online 공략", "FC Online 손흥민 리뷰"]  # 예시 제공
+        )
+
+    AgentAction.__qualname__ = "AgentAction"
+    return AgentAction
+
+
+def __getattr__(name: str):
+    # `from main import AgentAction`처럼 모듈 속성으로 접근할 때도 지연 로딩
+    if name == "AgentAction":
+        return agent_action_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def player_names(keyword: str) -> List[str]:
+    """
+    쉼표로 구분된 선수 이름 목록 ("손흥민, 살라" -> ["손흥민", "살라"])
+    """
+    return [name.strip() for name in (keyword or "").split(",") if name.strip()]
+
+
+def nexon_error_message(error: "UpstreamDegraded") -> str:
+    """
+    Nexon API 오류를 사용자에게 보여 줄 안내 문구 (장애와 요청 거절을 구분)
+    """
+    if isinstance(error, UpstreamRejected):
+        return '⚠️ Nexon API가 요청을 거절했습니다. 잠시 후 다시 시도하거나 관리자에게 문의해 주세요.'
+    return '⚠️ Nexon API 응답이 원활하지 않습니다. 잠시 후 다시 시도해 주세요.'
+
+
+def ambiguous_message(name: str, matches: List[str]) -> str:
+    """
+    이름이 여러 선수와 일치할 때 보여 줄 안내 문구
+    """
+    return f"❓ '{name}'과(와) 일치하는 선수가 여러 명입니다: {', '.join(matches)}. 전체 이름으로 다시 질문해 주세요."
+
+
+def make_action(action: str, action_input: str, search_keyword: str) -> dict:
+    """
+    AgentAction과 같은 형태의 분류 결과 dict (체인 출력 형식과 동일)
+    """
+    return {"action": action, "action_input": action_input, "search_keyword": search_keyword}
+
+
+class MetadataCache:
+    """
+    Nexon 정적 메타데이터(spid, spposition, seasonid, matchtype)를 위한 공유 캐시
+    메모리에 프로세스 수명 동안 보관하고, 디스크에 저장해 재시작 시에도 다시 받지 않습니다.
+    TTL이 지나면 ETag/Last-Modified 조건부 GET으로 변경 여부만 확인합니다.
+    """
+
+    @classmethod
+    def shared(cls, cache_dir: str, ttl: float, http=None) -> "MetadataCache":
+        """
+        캐시 디렉터리별로 하나의 인스턴스를 프로세스 전체에서 공유합니다.
+        """
+        cache = process_singleton(("MetadataCache", cache_dir), lambda: cls(cache_dir, ttl, http))
+        cache.ttl = ttl
+        return cache
+
+    def __init__(self, cache_dir: str, ttl: float, http=None):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.http = http or requests  # get(url, headers=...)을 제공하는 HTTP 클라이언트
+        self._entries: Dict[str, dict] = {}  # url -> {data, etag, last_modified, fetched_at}
+        self._lock = threading.Lock()
+        self._url_locks: Dict[str, threading.Lock] = {}
+        self._derived: Dict[tuple, tuple] = {}  # (url, 이름) -> (원본 데이터, 파생 결과)
+
+    def _paths(self, url: str):
+        # URL의 파일 이름(spid.json 등)을 그대로 캐시 파일 이름으로 사용
+        name = os.path.basename(url)
+        return os.path.join(self.cache_dir, name), os.path.join(self.cache_dir, name + ".meta")
+
+    def _load_from_disk(self, url: str) -> Union[dict, None]:
+        data_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                entry = json.load(f)
+            with open(data_path, encoding="utf-8") as f:
+                entry["data"] = json.load(f)
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def _save_to_disk(self, url: str, entry: dict, write_data: bool = True):
+        data_path, meta_path = self._paths(url)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            if write_data:
+                # 임시 파일에 쓴 뒤 교체해서 중간에 끊겨도 깨진 파일이 남지 않게 함
+                with open(data_path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump(entry["data"], f, ensure_ascii=False)
+                os.replace(data_path + ".tmp", data_path)
+            meta = {k: v for k, v in entry.items() if k != "data"}
+            with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(meta_path + ".tmp", meta_path)
+        except OSError as e:
+            logger.warning("메타데이터 캐시 저장 실패: %s", e)
+
+    def _url_lock(self, url: str) -> threading.Lock:
+        with self._lock:
+            return self._url_locks.setdefault(url, threading.Lock())
+
+    def get(self, url: str) -> Any:
+        """
+        메타데이터를 반환합니다. TTL 안이면 네트워크 요청 없이 메모리 값을 사용합니다.
+        """
+        entry = self._entries.get(url)
+        if entry is not None and time.time() - entry["fetched_at"] < self.ttl:
+            metrics().inc("metadata_cache_total", result="hit")
+            return entry["data"]
+        metrics().inc("metadata_cache_total", result="miss")
+
+        # 같은 URL을 여러 스레드가 동시에 받지 않도록 URL별 락 사용
+        with self._url_lock(url):
+            entry = self._entries.get(url)
+            if entry is None:
+                entry = self._load_from_disk(url)
+                if entry is not None:
+                    self._entries[url] = entry
+            if entry is not None and time.time() - entry["fetched_at"] < self.ttl:
+                return entry["data"]
+            return self._revalidate(url, entry)
+
+    def get_derived(self, url: str, builder) -> Any:
+        """
+        메타데이터로부터 만든 파생 데이터(인덱스 등)를 반환합니다.
+        원본 데이터가 갱신될 때만 builder를 다시 호출합니다.
+        """
+        data = self.get(url)
+        key = (url, getattr(builder, "__qualname__", repr(builder)))
+        cached = self._derived.get(key)
+        if cached is not None and cached[0] is data:
+            return cached[1]
+        with self._url_lock(url):
+            cached = self._derived.get(key)
+            if cached is not None and cached[0] is data:
+                return cached[1]
+            result = builder(data)
+            self._derived[key] = (data, result)
+            return result
+
+    def _revalidate(self, url: str, entry: Union[dict, None]) -> Any:
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            with metrics().span("metadata_load"):
+                response = self.http.get(url, headers=headers)
+            if response.status_code == 304 and entry is not None:
+                # 변경 없음: 데이터는 그대로 두고 확인 시각만 갱신
+                entry["fetched_at"] = time.time()
+                self._save_to_disk(url, entry, write_data=False)
+                return entry["data"]
+            response.raise_for_status()  # 요청 실패 시 예외 발생
+        except requests.RequestException:
+            # 갱신에 실패해도 이전 데이터가 있으면 그대로 사용
+            if entry is not None:
+                return entry["data"]
+            raise
+
+        entry = {
+            "data": response.json(),
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "fetched_at": time.time(),
+        }
+        self._entries[url] = entry
+        self._save_to_disk(url, entry)
+        return entry["data"]
+
+
+class TokenBucket:
+    """
+    토큰 버킷 방식의 요청 속도 제한기
+    초당 rate개씩 토큰이 채워지고, 요청마다 토큰 하나를 소비합니다. (최대 capacity개)
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        토큰을 얻을 때까지 대기합니다.
+        """
+        if self.rate <= 0:  # 0 이하면 제한 없음
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class UpstreamDegraded(requests.RequestException):
+    """
+    외부 API 장애 (재시도 후에도 429/5xx 또는 연결 실패, 또는 회로 차단기가 열린 상태)
+    "선수를 찾을 수 없음"과 구분해 사용자에게 잠시 후 다시 시도하라고 안내하기 위한 예외입니다.
+    """
+
+
+class UpstreamRejected(UpstreamDegraded):
+    """
+    외부 API가 재시도해도 소용없는 응답으로 요청을 거절함 (401/403 키 오류, 404, 나눌 수 없는 400 등)
+    또는 성공 응답의 본문을 해석할 수 없음. "데이터 없음"으로 취급하지 않습니다.
+    """
+
+
+class CircuitBreaker:
+    """
+    호스트별 회로 차단기
+    연속 실패가 threshold번 쌓이면 cooldown초 동안 요청을 바로 거절하고(open),
+    그 뒤 한 요청만 시험 삼아 보내(half-open) 성공하면 다시 정상 상태(closed)로 돌아갑니다.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        if self.threshold <= 0:  # 0 이하면 사용하지 않음
+            return True
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = "half_open"
+                return True
+            return False
+
+    def record(self, success: bool):
+        with self._lock:
+            if success:
+                self.state = "closed"
+                self._failures = 0
+                return
+            self._failures += 1
+            if self.state == "half_open" or (self.threshold > 0 and self._failures >= self.threshold):
+                if self.state != "open":
+                    metrics().inc("circuit_open_total")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class HttpClient:
+    """
+    keep-alive 연결 풀을 공유하는 HTTP 클라이언트
+    호스트별 토큰 버킷으로 API 키 할당량을 지키고, 제한된 스레드 풀로 요청을 동시에 보냅니다.
+    여러 세션이 같은 요청을 동시에 보내면 한 번만 보내고 응답을 나눠 쓰며(single-flight),
+    429/5xx와 연결 오류는 흔들림을 준 지수 백오프로 재시도하고, 호스트별 회로 차단기로 장애 중인 API를 보호합니다.
+    """
+
+    # 재시도할 응답 코드
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    @classmethod
+    def shared(cls, max_workers: int, **options) -> "HttpClient":
+        """
+        프로세스 전체에서 하나의 클라이언트(연결 풀, 스레드 풀)를 공유합니다.
+        """
+        return process_singleton("HttpClient", lambda: cls(max_workers, **options))
+
+    def __init__(self, max_workers: int, timeout: float = 10.0, retries: int = 2, backoff: float = 0.2,
+                 breaker_threshold: int = 5, breaker_cooldown: float = 30.0):
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="http")
+        self._limiters: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._flights: Dict[tuple, Future] = {}  # 진행 중인 요청 키 -> 응답을 기다리는 Future
+        self._lock = threading.Lock()
+
+    def set_rate_limit(self, url: str, rate: float, burst: int):
+        """
+        url의 호스트로 가는 요청에 속도 제한을 설정합니다.
+        """
+        self._limiters[urlparse(url).netloc] = TokenBucket(rate, burst)
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_cooldown)
+            return self._breakers[host]
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET 요청을 보냅니다. 같은 url/params/headers 요청이 이미 진행 중이면 그 응답을 함께 받습니다.
+        재시도 후에도 실패하면 UpstreamDegraded를 던집니다. (4xx 등 그 밖의 응답은 그대로 반환)
+        """
+        parsed = urlparse(url)
+        # 외부 API별(호스트 + 마지막 경로) 호출 수, 응답 코드, 받은 바이트 수 기록
+        labels = {"host": parsed.netloc, "endpoint": parsed.path.rstrip("/").rsplit("/", 1)[-1]}
+        key = (url, json.dumps(kwargs.get("params"), sort_keys=True, default=str),
+               json.dumps(kwargs.get("headers"), sort_keys=True, default=str))
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = Future()
+        if not leader:
+            metrics().inc("upstream_deduplicated_total", **labels)
+            return flight.result()
+
+        try:
+            response = self._get_with_retries(url, parsed.netloc, labels, **kwargs)
+            flight.set_result(response)
+            return response
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+
+    def _get_with_retries(self, url: str, host: str, labels: dict, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        limiter = self._limiters.get(host)
+        breaker = self.breaker(host)
+        response, error = None, None
+
+        for attempt in range(self.retries + 1):
+            if attempt:
+                metrics().inc("upstream_retries_total", **labels)
+                time.sleep(self._retry_delay(attempt, response))
+            if not breaker.allow():
+                # 시험 요청이 진행 중(half-open)이면 그 결과를 기다렸다가 다시 시도
+                if breaker.state == "half_open" and attempt < self.retries:
+                    continue
+                metrics().inc("upstream_requests_total", status="circuit_open", **labels)
+                raise UpstreamDegraded(f"{host} 회로 차단기 열림 (최근 요청이 계속 실패함)")
+            if limiter is not None:
+                limiter.acquire()
+
+            try:
+                response, error = self.session.get(url, **kwargs), None
+            except requests.RequestException as e:
+                metrics().inc("upstream_requests_total", status="error", **labels)
+                breaker.record(False)
+                response, error = None, e
+                continue
+            metrics().inc("upstream_requests_total", status=str(response.status_code), **labels)
+            metrics().inc("upstream_bytes_total", len(response.content), **labels)
+            if response.status_code not in self.RETRY_STATUSES:
+                breaker.record(True)
+                return response
+            breaker.record(False)
+
+        if response is not None:
+            raise UpstreamDegraded(f"{host} 응답 {response.status_code} (재시도 {self.retries}회 후)", response=response)
+        raise UpstreamDegraded(f"{host} 연결 실패 (재시도 {self.retries}회 후): {error}") from error
+
+    def _retry_delay(self, attempt: int, response: Union[requests.Response, None]) -> float:
+        """
+        재시도 전 대기 시간: Retry-After 헤더가 있으면 따르고(최대 10초), 없으면 0~backoff*2^(attempt-1)초 사이 무작위
+        """
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), 10.0)
+        return random.uniform(0, self.backoff * 2 ** (attempt - 1))
+
+    def map(self, fn, items) -> list:
+        """
+        items 각각에 fn을 스레드 풀에서 동시에 실행하고, 입력 순서대로 결과를 반환합니다.
+        """
+        return list(self.executor.map(fn, items))
+
+
+class TTLCache:
+    """
+    항목 수 제한(LRU)과 만료 시간(TTL)을 함께 가지는 스레드 안전 캐시
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = max(1, maxsize)
+        self.ttl = ttl
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()  # key -> (만료 시각, 값)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None or item[0] < time.time():
+                if item is not None:
+                    del self._data[key]  # 만료된 항목 제거
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)  # 최근 사용 항목으로 갱신
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value, ttl: Union[float, None] = None):
+        with self._lock:
+            self._data[key] = (time.time() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)  # 가장 오래 사용되지 않은 항목 제거
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def dump(self) -> List[list]:
+        """
+        만료되지 않은 항목을 [키, 만료 시각, 값] 목록으로 반환합니다. (디스크 저장용)
+        """
+        now = time.time()
+        with self._lock:
+            return [[key, expires_at, value] for key, (expires_at, value) in self._data.items() if expires_at >= now]
+
+    def load(self, entries: List[list]):
+        """
+        dump()로 저장한 항목을 다시 채웁니다.
+        """
+        now = time.time()
+        with self._lock:
+            for key, expires_at, value in entries:
+                if expires_at >= now:
+                    self._data[key] = (expires_at, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class QuotaLedger:
+    """
+    YouTube Data API 할당량 장부
+    실제로 사용한 단위와 캐시 덕분에 아낀 단위를 작업별로 기록합니다.
+    """
+
+    # 작업별 할당량 비용 (YouTube Data API 기준)
+    COSTS = {"search.list": 100, "videos.list": 1}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spent: Dict[str, int] = {}
+        self.saved: Dict[str, int] = {}
+
+    def spend(self, op: str, calls: int = 1):
+        with self._lock:
+            self.spent[op] = self.spent.get(op, 0) + self.COSTS[op] * calls
+
+    def save(self, op: str, calls: int = 1):
+        with self._lock:
+            self.saved[op] = self.saved.get(op, 0) + self.COSTS[op] * calls
+
+    def report(self) -> dict:
+        with self._lock:
+            return {
+                "spent": sum(self.spent.values()),
+                "saved": sum(self.saved.values()),
+                "spent_by_op": dict(self.spent),
+                "saved_by_op": dict(self.saved),
+            }
+
+
+class YouTubeCache:
+    """
+    YouTube 검색 결과/통계 캐시와 할당량 장부를 묶은 프로세스 전역 객체
+    검색 결과(search.list, 100 단위)는 길게, 조회수/좋아요(videos.list)는 짧게 보관합니다.
+    """
+
+    @classmethod
+    def shared(cls, maxsize: int, search_ttl: float, stats_ttl: float) -> "YouTubeCache":
+        return process_singleton("YouTubeCache", lambda: cls(maxsize, search_ttl, stats_ttl))
+
+    def __init__(self, maxsize: int, search_ttl: float, stats_ttl: float):
+        self.search = TTLCache(maxsize, search_ttl)  # 검색 키 -> (검색 결과 항목, 페이지 수)
+        self.stats = TTLCache(maxsize * 10, stats_ttl)  # video id -> statistics
+        self.ledger = QuotaLedger()
+
+
+def normalize_query(text: str) -> str:
+    """
+    캐시 키용 질의 정규화 (유니코드 정규화, 소문자, 연속 공백 정리)
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    return " ".join(text.split())
+
+
+def normalize_intent_query(text: str) -> str:
+    """
+    질의 분류 캐시 키용 정규화
+    구두점/이모지 등을 공백으로 바꿔 "메시 스탯 알려줘"와 "메시 스탯 알려줘!"를 같은 키로 만듭니다.
+    """
+    text = unicodedata.normalize("NFKC", text).lower()
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(text.split())
+
+
+class IntentCache:
+    """
+    LLM 질의 분류 결과(AgentAction) 캐시
+    1단계: 정규화된 질의 완전 일치 (LRU/TTL)
+    2단계(선택): 임베딩 코사인 유사도가 기준 이상인 이전 분류 결과 재사용
+    분류 결과는 디스크에 저장해 재시작 후에도 재사용합니다.
+    저장은 요청 경로에서 하지 않고, 변경을 FLUSH_DELAY초 동안 모아 백그라운드 스레드에서 한 번에 씁니다.
+    """
+
+    # 첫 변경 후 이 시간(초) 동안의 변경을 모아 한 번에 저장
+    FLUSH_DELAY = 2.0
+
+    @classmethod
+    def shared(cls, path: str, maxsize: int, ttl: float) -> "IntentCache":
+        return process_singleton(("IntentCache", path), lambda: cls(path, maxsize, ttl))
+
+    def __init__(self, path: str, maxsize: int, ttl: float):
+        self.path = path
+        self.exact = TTLCache(maxsize, ttl)
+        self._vectors: "OrderedDict[str, list]" = OrderedDict()  # 정규화 질의 -> 임베딩 벡터
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()  # 여러 스레드가 같은 임시 파일에 동시에 쓰지 않도록
+        self.similar_hits = 0
+        self._dirty = False
+        self._flush_timer: Union[threading.Timer, None] = None
+        self._load()
+        atexit.register(self.flush)
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                saved = json.load(f)
+            self.exact.load(saved.get("entries", []))
+            for key, vector in saved.get("vectors", []):
+                self._vectors[key] = vector
+        except (OSError, ValueError):
+            pass
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with self._save_lock:
+                with self._lock:
+                    saved = {"entries": self.exact.dump(), "vectors": list(self._vectors.items())}
+                with open(self.path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump(saved, f, ensure_ascii=False)
+                os.replace(self.path + ".tmp", self.path)
+        except OSError as e:
+            logger.warning("질의 분류 캐시 저장 실패: %s", e)
+
+    def get(self, query: str, embed=None, threshold: float = 0.0) -> Union[dict, None]:
+        """
+        캐시된 분류 결과를 반환합니다. embed와 threshold가 주어지면 유사 질의도 찾습니다.
+        """
+        key = normalize_intent_query(query)
+        result = self.exact.get(key)
+        if result is None and embed is not None and threshold > 0:
+            result = self._get_similar(embed(key), threshold)
+        if result is None:
+            return None
+        # 원본 질의 텍스트는 이번 질의로 바꿔서 반환
+        return {**result, "action_input": query}
+
+    def _get_similar(self, vector: list, threshold: float) -> Union[dict, None]:
+        np = _lazy_import("numpy")
+
+        with self._lock:
+            if not self._vectors:
+                return None
+            keys = list(self._vectors.keys())
+            matrix = np.asarray(list(self._vectors.values()), dtype=float)
+        query_vector = np.asarray(vector, dtype=float)
+        norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(query_vector)
+        scores = matrix @ query_vector / np.where(norms == 0, 1, norms)
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        result = self.exact.get(keys[best])
+        if result is not None:
+            self.similar_hits += 1
+        return result
+
+    def set(self, query: str, result: dict, embed=None):
+        key = normalize_intent_query(query)
+        self.exact.set(key, dict(result))
+        if embed is not None:
+            vector = embed(key)
+            with self._lock:
+                self._vectors[key] = list(vector)
+                self._vectors.move_to_end(key)
+                while len(self._vectors) > self.exact.maxsize:
+                    self._vectors.popitem(last=False)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """
+        저장 예약이 없으면 FLUSH_DELAY초 뒤 백그라운드에서 저장하도록 예약합니다. (이미 있으면 그 저장에 합침)
+        """
+        with self._lock:
+            self._dirty = True
+            if self._flush_timer is not None:
+                return
+            self._flush_timer = threading.Timer(self.FLUSH_DELAY, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """
+        아직 저장하지 않은 변경이 있으면 바로 디스크에 씁니다. (예약 저장, 프로세스 종료 시 호출)
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return
+            self._dirty = False
+        self._save()
+
+
+class StatsStore:
+    """
+    ranker-stats 결과를 (spid, 매치 타입, 포지션) 단위로 보관하는 로컬 SQLite 저장소
+    수집 작업(ingest.py)이 미리 채워 두거나 실시간 조회 결과를 함께 저장하고,
+    충분히 최근 데이터면 search_stat이 Nexon API를 호출하지 않고 바로 읽습니다.
+    데이터가 없는 포지션도 status를 NULL로 저장해 "데이터 없음"을 다시 조회하지 않게 합니다.
+    """
+
+    @classmethod
+    def shared(cls, path: str) -> "StatsStore":
+        return process_singleton(("StatsStore", path), lambda: cls(path))
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # 여러 스레드가 하나의 연결을 락으로 나눠 씀
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS ranker_stats (
+                    spid INTEGER NOT NULL,
+                    matchtype INTEGER NOT NULL,
+                    position INTEGER NOT NULL,
+                    status TEXT,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (spid, matchtype, position)
+                )""")
+
+    def get(self, spid: int, match: int, positions: List[int], max_age: float) -> Union[Dict[int, dict], None]:
+        """
+        모든 포지션의 데이터가 max_age초 안에 저장된 것이면 {포지션: status}를 반환합니다. (데이터 없는 포지션은 제외)
+        하나라도 없거나 오래됐으면 None을 반환합니다.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT position, status FROM ranker_stats WHERE spid = ? AND matchtype = ? AND fetched_at >= ?",
+                (spid, match, time.time() - max_age)).fetchall()
+        found = {position: status for position, status in rows}
+        if any(position not in found for position in positions):
+            return None
+        return {position: json.loads(found[position]) for position in positions if found[position] is not None}
+
+    def fresh_keys(self, max_age: float) -> set:
+        """
+        max_age초 안에 저장된 (spid, 매치 타입) 목록 (증분 수집 때 건너뛸 대상)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT spid, matchtype FROM ranker_stats GROUP BY spid, matchtype HAVING MIN(fetched_at) >= ?",
+                (time.time() - max_age,)).fetchall()
+        return {(spid, match) for spid, match in rows}
+
+    def put(self, spid: int, match: int, statuses: Dict[int, Union[dict, None]]):
+        """
+        {포지션: status 또는 None(데이터 없음)}을 저장합니다.
+        """
+        now = time.time()
+        rows = [(spid, match, position, None if status is None else json.dumps(status), now)
+                for position, status in statuses.items()]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO ranker_stats (spid, matchtype, position, status, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                rows)
+
+
+class StatsPrefetcher:
+    """
+    사용자가 시즌/매치 타입을 고르는 동안 랭커 통계를 미리 조회하는 프로세스 전역 실행기
+    전용 스레드 풀(max_workers)로 동시 실행 수를 제한하고, (spid, 매치 타입)별 Future를 잠시 보관해
+    "결과 확인"을 누르면 이미 끝난(또는 진행 중인) 조회 결과를 바로 사용합니다.
+    아직 시작하지 않은 조회는 선택이 바뀌면 취소됩니다.
+    """
+
+    @classmethod
+    def shared(cls, max_workers: int, ttl: float) -> "StatsPrefetcher":
+        return process_singleton("StatsPrefetcher", lambda: cls(max_workers, ttl))
+
+    def __init__(self, max_workers: int, ttl: float):
+        self.executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="prefetch")
+        self.futures = TTLCache(256, ttl)  # (spid, 매치 타입) -> Future({포지션: status})
+        self._choices: Counter = Counter()  # 사용자가 실제로 고른 매치 타입 빈도
+        self._lock = threading.Lock()
+
+    def submit(self, key: tuple, fn) -> Future:
+        """
+        key의 조회를 예약합니다. 이미 예약/진행 중이거나 끝난 조회가 있으면 그 Future를 반환합니다.
+        """
+        with self._lock:
+            future = self.futures.get(key)
+            if future is None or future.cancelled() or (future.done() and future.exception() is not None):
+                future = self.executor.submit(fn)
+                self.futures.set(key, future)
+            return future
+
+    def take(self, key: tuple) -> Union[Future, None]:
+        """
+        key의 미리 조회한 Future를 반환합니다. 아직 시작하지 않았으면 취소하고 None을 반환합니다. (바로 조회하는 편이 빠름)
+        """
+        future = self.futures.get(key)
+        if future is None or future.cancel() or future.cancelled():
+            return None
+        return future
+
+    def record_choice(self, match: int):
+        with self._lock:
+            self._choices[match] += 1
+
+    def rank_matches(self, matches: List[int]) -> List[int]:
+        """
+        자주 고른 매치 타입이 앞에 오도록 정렬합니다. (처음에는 메타데이터 순서)
+        """
+        with self._lock:
+            return sorted(matches, key=lambda match: -self._choices[match])
+
+
+def normalize_name(name: str) -> str:
+    """
+    선수 이름 비교용 정규화
+    공백/구두점을 제거하고 한글 음절을 자모로 분해(NFD)해서
+    "로날트쿠만"과 "로날트 쿠만", 입력 중인 "쿠마"와 "쿠만"처럼 비교할 수 있게 합니다.
+    """
+    name = unicodedata.normalize("NFKC", name).lower()
+    name = re.sub(r"[\s.\-·'`]+", "", name)
+    return unicodedata.normalize("NFD", name)
+
+
+def index_seasons(seasonid_data: List[dict]) -> Dict[str, int]:
+    """
+    시즌 표시 이름(className) -> 시즌 id
+    """
+    return {season["className"]: season["seasonId"] for season in seasonid_data if season.get("className")}
+
+
+def index_match_types(match_data: List[dict]) -> Dict[str, int]:
+    """
+    매치 타입 설명(desc) -> 매치 타입 id
+    """
+    return {match["desc"]: match["matchtype"] for match in match_data if match.get("desc")}
+
+
+class PlayerIndex:
+    """
+    spid.json으로부터 만드는 선수 검색 인덱스
+    이름 -> 시즌 -> spid 매핑을 메타데이터 갱신 시 한 번만 만들어 두고,
+    질의마다 전체 선수 목록을 훑지 않습니다.
+    """
+
+    def __init__(self, spid_data: List[dict]):
+        self.names: Dict[str, str] = {}  # 정규화 이름 -> 원래 이름
+        self._by_name: Dict[str, Dict[int, List[int]]] = {}  # 정규화 이름 -> {시즌 id: [spid]}
+        suffixes = set()
+
+        for player in spid_data:
+            spid = int(player["id"])
+            season_id = spid // 1_000_000  # spid = 시즌 id * 1,000,000 + 선수 고유 번호
+            key = normalize_name(player["name"])
+            self.names.setdefault(key, player["name"])
+            self._by_name.setdefault(key, {}).setdefault(season_id, []).append(spid)
+
+            # 부분 검색용: 이름의 각 단어 시작 위치부터의 접미사 ("로날트 쿠만" -> "쿠만")
+            words = player["name"].split()
+            for i in range(len(words)):
+                suffixes.add((normalize_name("".join(words[i:])), key))
+
+        for seasons in self._by_name.values():
+            for spids in seasons.values():
+                spids.sort()
+        self._suffixes = sorted(suffixes)  # 이분 탐색용 정렬 목록
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def _match_tiers(self, name: str) -> Tuple[List[str], List[str]]:
+        """
+        (완전 일치 또는 단어 단위 접미사 완전 일치, 단어 시작 기준 접두 일치) 정규화 이름 목록을 짧은 이름 순으로 반환합니다.
+        """
+        key = normalize_name(name)
+        if not key:
+            return [], []
+        if key in self._by_name:
+            return [key], []
+
+        start = bisect.bisect_left(self._suffixes, (key, ""))
+        exact, prefix = set(), set()
+        for suffix, full_key in self._suffixes[start:]:
+            if not suffix.startswith(key):
+                break
+            (exact if suffix == key else prefix).add(full_key)
+        order = lambda k: (len(k), k)
+        return sorted(exact, key=order), sorted(prefix - exact, key=order)
+
+    def candidates(self, name: str) -> List[str]:
+        """
+        입력 이름과 일치하는 정규화 이름 목록을 잘 맞는 순서로 반환합니다.
+        완전 일치가 있으면 그것만, 없으면 단어 접미사 완전 일치("살라" -> "모하메드 살라")를 접두 일치("살라스")보다 앞에 둡니다.
+        """
+        exact, prefix = self._match_tiers(name)
+        return exact + prefix
+
+    def ambiguous(self, name: str) -> List[str]:
+        """
+        가장 잘 맞는 단계에서 서로 다른 선수가 둘 이상 일치하면 그 선수들의 원래 이름 목록을, 아니면 빈 목록을 반환합니다.
+        ("실바" -> ["다비드 실바", "베르나르두 실바"])
+        """
+        exact, prefix = self._match_tiers(name)
+        best = exact or prefix
+        return [self.names[key] for key in best] if len(best) > 1 else []
+
+    def seasons(self, name: str) -> Dict[int, List[int]]:
+        """
+        가장 잘 맞는 선수 한 명의 {시즌 id: [spid]} 매핑을 반환합니다. (다른 선수의 카드는 합치지 않음)
+        """
+        candidates = self.candidates(name)
+        if not candidates:
+            return {}
+        return {season_id: list(spids) for season_id, spids in self._by_name[candidates[0]].items()}
+
+    def find(self, name: str, season_id: int) -> List[int]:
+        """
+        이름과 시즌으로 가장 잘 맞는 선수 한 명의 spid 목록을 찾습니다.
+        """
+        candidates = self.candidates(name)
+        if not candidates:
+            return []
+        return list(self._by_name[candidates[0]].get(season_id, []))
+
+    def is_name(self, text: str) -> bool:
+        """
+        text가 어떤 선수의 전체 이름이나 단어 단위 접미사("로날트 쿠만"의 "쿠만")와 정확히 같은지 확인합니다.
+        """
+        key = normalize_name(text)
+        if not key:
+            return False
+        i = bisect.bisect_left(self._suffixes, (key, ""))
+        return i < len(self._suffixes) and self._suffixes[i][0] == key
+
+
+# LLM 질의 분류 프롬프트 (규칙은 짧게, 예시는 FewShotSelector가 질의와 비슷한 것만 골라 넣음)
+CLASSIFY_PROMPT = """FC Online(넥슨 축구 게임) 관련 질의를 분류하세요.
+- additional_input: 선수 이름 + 통계 키워드(스탯, 통계, 평균, 경기력). search_keyword는 입력에 적힌 선수 이름 그대로
+- compare_stats: 선수 이름 둘 이상 + 통계 키워드나 비교 표현(vs, 비교). search_keyword는 입력에 적힌 선수 이름들을 쉼표로 구분
+- search_video: 영상 키워드(공략, 활용법, 추천 영상, 전술 강좌)나 선수 이름이 있는 게임 질의. search_keyword는 최적화된 검색어
+- not_supported: FC Online과 관련 없는 질의(실제 축구 경기, 다른 분야). search_keyword는 ""
+- "피파" 단독은 선수 이름이나 게임 맥락 키워드(전술, 포지션, 공략, 활용법)가 함께 있을 때만 FC Online 질의
+- 우선순위: compare_stats > additional_input > search_video > not_supported
+- action_input은 입력 질의 원문
+
+예시:
+{examples}
 
-# 파이썬 타입 힌팅을 위한 임포트
-# 타입 힌팅은 코드의 가독성을 높이고 IDE의 자동완성 기능을 개선합니다
-from typing import List, Union, Any, Dict, Literal  # 다양한 타입 힌팅 클래스들
+분석할 질의: {input}
 
-# 유틸리티 라이브러리들
-from datetime import datetime  # 날짜와 시간 처리를 위한 클래스
-from dataclasses import dataclass  # 데이터 클래스 생성을 위한 데코레이터
-from pydantic import BaseModel, Field  # 데이터 검증과 직렬화를 위한 Pydantic 라이브러리
-import requests  # HTTP 요청 처리를 위한 라이브러리
-import re  # 정규 표현식 처리를 위한 라이브러리
-import os  # 운영체제 관련 기능과 환경 변수 접근을 위한 라이브러리
-from dotenv import load_dotenv  # .env 파일에서 환경 변수를 로드하기 위한 라이브러리
-import matplotlib.pyplot as plt
-from matplotlib import rc
-from urllib.parse import quote
+{format_instructions}"""
+
+# JSON 응답 형식 안내 (JsonOutputParser의 JSON 스키마 안내문 대신 쓰는 짧은 버전)
+FORMAT_INSTRUCTIONS = (
+    '다른 설명 없이 JSON 객체 하나로만 답하세요: '
+    '{"action": "additional_input" | "compare_stats" | "search_video" | "not_supported", '
+    '"action_input": "...", "search_keyword": "..."}')
+
+# 질의 분류 예시 모음: (질의, action, search_keyword)
+EXAMPLE_BANK = [
+    ("게임 내 로날트 쿠만 경기 평균 스탯 알려줘.", "additional_input", "로날트 쿠만"),
+    ("게임 내 메시 경기 평균 스탯은?", "additional_input", "메시"),
+    ("호날두의 강화 후 경기력 분석해줘.", "additional_input", "호날두"),
+    ("피파 메시 경기 평균 스탯 알려줘.", "additional_input", "메시"),
+    ("손흥민 통계 보여줘", "additional_input", "손흥민"),
+    ("살라 평균 골 몇 개야?", "additional_input", "살라"),
+    ("FC온라인 음바페 경기력 어때?", "additional_input", "음바페"),
+    ("반 다이크 태클 평균 스탯", "additional_input", "반 다이크"),
+    ("손흥민 vs 살라 스탯 비교", "compare_stats", "손흥민, 살라"),
+    ("메시랑 호날두 평균 통계 비교해줘", "compare_stats", "메시, 호날두"),
+    ("음바페, 홀란, 케인 경기력 비교", "compare_stats", "음바페, 홀란, 케인"),
+    ("FC Online 메시 활용법 영상 추천해줘.", "search_video", "FC Online 메시 활용법"),
+    ("최신 전술 추천 영상 있어?", "search_video", "FC Online 최신 전술 추천"),
+    ("피파 전술 추천 영상 있어?", "search_video", "피파 전술 추천"),
+    ("피파 온라인 활용법 추천해줘.", "search_video", "피파 온라인 활용법"),
+    ("손흥민 활용법", "search_video", "FC Online 손흥민 활용법"),
+    ("4-2-3-1 포메이션 공략 알려줘", "search_video", "FC Online 4-2-3-1 공략"),
+    ("피파 선수 강화 팁 영상", "search_video", "피파 선수 강화 팁"),
+    ("넥슨 FC온라인 초보 전술 강좌", "search_video", "FC Online 초보 전술 강좌"),
+    ("챔피언스리그 결과 알려줘.", "not_supported", ""),
+    ("피파 챔피언스리그 결과 알려줘.", "not_supported", ""),
+    ("피파 경기 분석 부탁해.", "not_supported", ""),
+    ("피파", "not_supported", ""),
+    ("오늘 날씨 어때?", "not_supported", ""),
+    ("어제 토트넘 경기 하이라이트", "not_supported", ""),
+    ("손흥민 이적료 얼마야?", "not_supported", ""),
+]
+
+
+def count_tokens(text: str) -> int:
+    """
+    프롬프트 토큰 수 (tiktoken을 쓸 수 없으면 UTF-8 3바이트당 1토큰으로 어림)
+    """
+    encoder = process_singleton("TokenEncoder", _load_token_encoder)
+    if encoder is None:
+        return max(1, len(text.encode("utf-8")) // 3)
+    return len(encoder.encode(text))
 
-# streamlit 모듈
-import streamlit as st
 
+def _load_token_encoder():
+    try:
+        return _lazy_import("tiktoken").get_encoding("o200k_base")
+    except Exception:  # 설치되지 않았거나 인코딩 파일을 내려받을 수 없음
+        return None
 
-@dataclass
-class AssistantConfig:
+
+class FewShotSelector:
     """
-    Assistant의 설정을 관리하는 데이터 클래스
-    데이터클래스는 설정값을 깔끔하게 관리하고 타입 검사를 제공합니다.
-    
-    Attributes:
-        youtube_api_key (str): YouTube Data API 접근을 위한 인증 키
-        llm_model (str): 사용할 언어 모델의 이름 (예: gpt-4)
-        temperature (float): 언어 모델의 창의성 조절 파라미터 (0.0 = 결정적, 1.0 = 창의적)
-        not_supported_message (str): FC Online 게임 관련이 아닌 질문에 대한 기본 응답 메시지
+    예시 모음에서 질의와 가장 비슷한 k개를 고르는 선택기
+    기본은 글자 2-gram 유사도(추가 호출 없음)이고, embed를 주면 임베딩 코사인 유사도를 사용합니다.
+    action마다 가장 비슷한 예시를 하나씩 먼저 넣어 네 가지 분류(additional_input, compare_stats, search_video, not_supported)가 모두 보이게 합니다.
     """
-    youtube_api_key: str
-    nexon_api_key: str
-    openai_api_key : str
-    llm_model: str
-    temperature: float = 0.0
-    not_supported_message: str = "😭 죄송합니다. FC Online 게임 관련 영상만 제공할 수 있습니다.⚽"
 
+    def __init__(self, examples: List[tuple], embed=None):
+        self.examples = examples
+        self.embed = embed
+        self._grams = [self._bigrams(query) for query, _, _ in examples]
+        self._vectors = None  # 임베딩은 처음 사용할 때 계산
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bigrams(text: str) -> set:
+        text = normalize_intent_query(text).replace(" ", "")
+        return {text[i:i + 2] for i in range(len(text) - 1)} or {text}
+
+    def _scores(self, query: str) -> List[float]:
+        if self.embed is None:
+            grams = self._bigrams(query)
+            return [len(grams & other) / ((len(grams) * len(other)) ** 0.5) for other in self._grams]
+
+        np = _lazy_import("numpy")
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.asarray([self.embed(q) for q, _, _ in self.examples], dtype=float)
+        vector = np.asarray(self.embed(query), dtype=float)
+        norms = np.linalg.norm(self._vectors, axis=1) * np.linalg.norm(vector)
+        return list(self._vectors @ vector / np.where(norms == 0, 1, norms))
+
+    def select(self, query: str, k: int) -> List[tuple]:
+        """
+        비슷한 순서로 최대 k개의 예시를 반환합니다.
+        """
+        scores = self._scores(query)
+        ranked = sorted(range(len(self.examples)), key=lambda i: -scores[i])
+        chosen = []
+        for action in ("additional_input", "compare_stats", "search_video", "not_supported"):
+            best = next((i for i in ranked if self.examples[i][1] == action), None)
+            if best is not None:
+                chosen.append(best)
+        chosen = chosen[:k]
+        chosen += [i for i in ranked if i not in chosen][:max(0, k - len(chosen))]
+        return [self.examples[i] for i in sorted(chosen, key=lambda i: -scores[i])]
+
+    @staticmethod
+    def format(examples: List[tuple]) -> str:
+        return "\n".join(
+            f'질의: "{query}" -> {json.dumps({"action": action, "search_keyword": keyword}, ensure_ascii=False)}'
+            for query, action, keyword in examples)
+
+
+class IntentRouter:
+    """
+    LLM 호출 전에 적용하는 규칙 기반 질의 분류기
+    프롬프트의 규칙(통계 키워드 + 선수 이름, 동영상 키워드, "피파" 단독)을 그대로 적용해
+    확실한 경우에만 AgentAction을 바로 반환하고, 애매한 질의는 None을 반환해 LLM에 넘깁니다.
+    """
 
-class AgentAction(BaseModel):
+    # 프롬프트 규칙의 키워드 목록
+    STAT_KEYWORDS = ("스탯", "통계", "평균", "경기력")
+    COMPARE_KEYWORDS = ("vs", "비교", "대결")
+    VIDEO_KEYWORDS = ("공략", "활용법", "추천 영상", "전술 강좌")
+    GAME_KEYWORDS = ("fc online", "fc온라인", "fconline", "피파 온라인", "피파온라인", "nexon", "넥슨", "피파")
+    # 검색어에서 뺄 요청 표현
+    FILLER_WORDS = ("영상", "추천해줘", "알려줘", "보여줘", "찾아줘", "있어", "있나요", "줘")
+    # 선수 이름 뒤에 붙는 조사
+    PARTICLES = ("이랑", "의", "은", "는", "이", "가", "을", "를", "도", "랑", "와", "과")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = 0
+        self.hits = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.total if self.total else 0.0
+
+    def _record(self, hit: bool):
+        with self._lock:
+            self.total += 1
+            self.hits += int(hit)
+
+    def _match_name(self, words: List[str], index: PlayerIndex) -> Union[str, None]:
+        """
+        단어 조합(조사 제거 포함)이 선수 이름이면 입력에 적힌 그대로 반환합니다.
+        """
+        text = " ".join(words)
+        for candidate in [text] + [text[:-len(p)] for p in self.PARTICLES if text.endswith(p)]:
+            if len(candidate.replace(" ", "")) >= 2 and index.is_name(candidate):
+                return candidate
+        return None
+
+    def find_player(self, query: str, index: PlayerIndex) -> Union[str, None]:
+        """
+        질의에서 선수 이름을 찾아 입력에 적힌 그대로 반환합니다. (긴 단어 조합 우선)
+        """
+        words = re.findall(r"[\w.]+", query)
+        for size in (3, 2, 1):
+            for i in range(len(words) - size + 1):
+                found = self._match_name(words[i:i + size], index)
+                if found is not None:
+                    return found
+        return None
+
+    def find_players(self, query: str, index: PlayerIndex) -> List[str]:
+        """
+        질의에 나오는 선수 이름을 나온 순서대로 모두 찾습니다. (위치마다 긴 단어 조합 우선, "A vs B"도 구분)
+        """
+        words = re.findall(r"[\w.]+", re.sub(r"(?i)(?<![a-z])vs\.?(?![a-z])", " ", query))
+        players = []
+        i = 0
+        while i < len(words):
+            for size in (3, 2, 1):
+                found = self._match_name(words[i:i + size], index) if i + size <= len(words) else None
+                if found is not None:
+                    if found not in players:
+                        players.append(found)
+                    i += size
+                    break
+            else:
+                i += 1
+        return players
+
+    def route(self, query: str, index: Union[PlayerIndex, None]) -> Union[dict, None]:
+        result = self._route(query, index)
+        self._record(result is not None)
+        return result
+
+    def _route(self, query: str, index: Union[PlayerIndex, None]) -> Union[dict, None]:
+        text = normalize_query(query)
+        words = re.findall(r"\w+", text)
+
+        # "피파" 단독 질의는 FC Online 외 질의로 판단
+        if words == ["피파"]:
+            return make_action("not_supported", query, "")
+
+        has_stat = any(keyword in text for keyword in self.STAT_KEYWORDS)
+        has_video = any(keyword in text for keyword in self.VIDEO_KEYWORDS)
+        has_game = any(keyword in text for keyword in self.GAME_KEYWORDS)
+        player = self.find_player(query, index) if index is not None else None
+
+        # 0순위: 선수 이름 둘 이상 + (통계 키워드 또는 비교 표현)
+        if index is not None and (has_stat or any(keyword in text for keyword in self.COMPARE_KEYWORDS)):
+            players = self.find_players(query, index)
+            if len(players) >= 2:
+                return make_action("compare_stats", query, ", ".join(players))
+
+        # 1순위: 선수 이름 + 통계 키워드
+        if has_stat and player:
+            return make_action("additional_input", query, player)
+
+        # 2순위: 통계 키워드 없이 동영상 키워드 + (선수 이름 또는 게임 키워드)
+        if has_video and not has_stat and (player or has_game):
+            words = [w for w in re.findall(r"\w+", query) if w not in self.FILLER_WORDS]
+            keyword = " ".join(words)
+            if not has_game:
+                keyword = f"FC Online {keyword}"
+            return make_action("search_video", query, keyword)
+
+        return None
+
+
+# 랭커 통계 필드 이름 -> 화면 표시 이름 (그래프/요약에 표시하는 순서)
+STAT_LABELS = {
+    "shoot": "슛",
+    "effectiveShoot": "유효슛",
+    "assist": "어시스트",
+    "goal": "골",
+    "dribbleTry": "드리블 시도",
+    "dribbleSuccess": "드리블 성공",
+    "passTry": "패스 시도",
+    "passSuccess": "패스 성공",
+    "block": "블록",
+    "tackle": "태클",
+}
+
+
+class PlayerStats:
     """
-    에이전트의 행동을 정의하는 Pydantic 모델
-    Pydantic은 데이터 검증 및 관리를 위한 라이브러리입니다.
+    포지션별 랭커 평균 통계를 지표 이름별 NumPy 배열로 보관하는 컨테이너
+    각 행은 하나의 포지션이고, 포지션별 경기 수(matchCount)를 가중치로 함께 가집니다.
     """
-    # Literal을 사용하여 action 필드가 가질 수 있는 값을 제한합니다
-    action: Literal["additional_input", "search_video", "not_supported"] = Field(
-        description="에이전트가 수행할 행동의 타입을 지정합니다",
-    )
 
-    action_input: str = Field(
-        description="사용자가 입력한 원본 질의 텍스트입니다",
-        min_length=1,  # 최소 1글자 이상이어야 함
-    )
+    def __init__(self, positions: List[int], fields: List[str], values: "np.ndarray", match_count: "np.ndarray"):
+        self.positions = positions
+        self.fields = fields
+        self.values = values  # (포지션 수, 지표 수) 배열, 값이 없으면 NaN
+        self.match_count = match_count
+
+    @classmethod
+    def from_statuses(cls, statuses: List[tuple]) -> "PlayerStats":
+        """
+        [(포지션, status dict), ...]로부터 한 번에 배열을 만듭니다.
+        STAT_LABELS 순서의 지표를 먼저 두고, 응답에 있는 나머지 숫자 지표를 뒤에 붙입니다.
+        """
+        np = _lazy_import("numpy")
+        fields = list(STAT_LABELS)
+        for _, status in statuses:
+            for key, value in status.items():
+                if key not in fields and key != "matchCount" and isinstance(value, (int, float)):
+                    fields.append(key)
+
+        values = np.array(
+            [[status.get(field, np.nan) for field in fields] for _, status in statuses],
+            dtype=float,
+        ).reshape(len(statuses), len(fields))
+        match_count = np.array([status.get("matchCount", 0) for _, status in statuses], dtype=float)
+        return cls([position for position, _ in statuses], fields, values, match_count)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def column(self, field: str) -> "np.ndarray":
+        return self.values[:, self.fields.index(field)]
+
+    def labeled_fields(self) -> List[str]:
+        """
+        표시 이름이 있는 지표 중 값이 하나라도 있는 지표
+        """
+        np = _lazy_import("numpy")
+        return [f for f in STAT_LABELS if f in self.fields and not np.isnan(self.column(f)).all()]
+
+    def summary(self, quantiles=(0.25, 0.5, 0.75)) -> Dict[str, dict]:
+        """
+        모든 지표의 요약 통계를 한 번에 계산합니다.
+        - mean: 경기 수 가중 평균
+        - quantiles: 포지션 간 분위수
+        ranker-stats는 경기당 평균만 주고 출전 시간은 주지 않으므로 90분당 환산 값은 계산하지 않습니다.
+        """
+        np = _lazy_import("numpy")
+        mask = ~np.isnan(self.values)
+        weights = mask * self.match_count[:, None]
+        total = weights.sum(axis=0)
+        means = np.where(total > 0, np.nansum(self.values * weights, axis=0) / np.where(total > 0, total, 1), np.nan)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # 값이 없는 지표는 NaN으로 둠
+            qs = np.nanquantile(self.values, quantiles, axis=0)
+
+        return {
+            field: {
+                "label": STAT_LABELS.get(field, field),
+                "mean": float(means[i]),
+                "quantiles": {q: float(qs[j, i]) for j, q in enumerate(quantiles)},
+            }
+            for i, field in enumerate(self.fields)
+        }
+
+    def summary_text(self) -> str:
+        """
+        표시 이름이 있는 지표의 가중 평균을 한 줄씩 정리한 텍스트
+        """
+        summary = self.summary()
+        lines = [f"- {summary[f]['label']}: {summary[f]['mean']:.2f}" for f in self.labeled_fields()]
+        return f"총 {int(self.match_count.sum()):,}경기 기준 평균\n" + "\n".join(lines)
+
+
+@dataclass
+class ChartArtifact:
+    """
+    한 번 렌더링한 통계 그래프 (PNG 바이트)와 텍스트 요약
+    matplotlib Figure 대신 이 객체를 대화 기록에 보관합니다.
+    """
+    png: bytes
+    summary: str = ""
 
-    search_keyword: str = Field(
-        description="""검색에 사용할 최적화된 키워드입니다.
-        특정 선수 평균 통계 관련 키워드일 경우 선수 이름을 포함하고,
-        이외의 경우 핵심 검색어를 포함,
-        not_supported 액션의 경우 빈 문자열('')을 사용합니다""",
-        examples=["FC Online 공략", "FC Online 손흥민 리뷰"]  # 예시 제공
-    )
+
+def render_chart(fig) -> bytes:
+    """
+    Figure를 PNG 바이트로 렌더링하고 바로 닫아 메모리를 돌려줍니다.
+    """
+    try:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=100)
+        return buffer.getvalue()
+    finally:
+        load_pyplot().close(fig)
 
 
 class Assistant:
@@ -78,6 +1663,24 @@ class Assistant:
     이 클래스는 사용자 질의를 처리하고 관련 정보를 검색하는 핵심 기능을 제공합니다.
     """
 
+    @classmethod
+    def shared(cls) -> "Assistant":
+        """
+        프로세스 전체에서 하나만 만들어 공유하는 인스턴스를 반환합니다.
+        처음 호출될 때 환경 변수로 생성하고 warm_up()까지 마칩니다.
+        """
+        def create():
+            started = time.perf_counter()
+            assistant = cls.from_env()
+            assistant.warm_up()
+            record_startup_timing("assistant_warm_up", time.perf_counter() - started)
+            logger.info("시작 시간(초): %s", startup_timings())
+            if assistant.config.metrics_port:
+                start_metrics_server(assistant.config.metrics_port, assistant.config.metrics_host)
+            return assistant
+
+        return process_singleton("Assistant", create)
+
     @classmethod
     def from_env(cls) -> "Assistant":
         """
@@ -94,6 +1697,45 @@ class Assistant:
             llm_model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),  # 기본 모델 지정
             temperature=float(os.getenv("TEMPERATURE", "0.0")
                                 ),  # 문자열을 float로 변환
+            metadata_cache_dir=os.getenv("METADATA_CACHE_DIR", ".cache/metadata"),
+            metadata_ttl=float(os.getenv("METADATA_TTL", str(6 * 60 * 60))),
+            nexon_concurrency=int(os.getenv("NEXON_CONCURRENCY", "8")),
+            nexon_rate_limit=float(os.getenv("NEXON_RATE_LIMIT", "5.0")),
+            nexon_rate_burst=int(os.getenv("NEXON_RATE_BURST", "5")),
+            ranker_batch_size=int(os.getenv("RANKER_BATCH_SIZE", "20")),
+            youtube_search_ttl=float(os.getenv("YOUTUBE_SEARCH_TTL", str(6 * 60 * 60))),
+            youtube_stats_ttl=float(os.getenv("YOUTUBE_STATS_TTL", str(30 * 60))),
+            youtube_cache_size=int(os.getenv("YOUTUBE_CACHE_SIZE", "1024")),
+            intent_cache_path=os.getenv("INTENT_CACHE_PATH", ".cache/intent_cache.json"),
+            intent_cache_size=int(os.getenv("INTENT_CACHE_SIZE", "4096")),
+            intent_cache_ttl=float(os.getenv("INTENT_CACHE_TTL", str(7 * 24 * 60 * 60))),
+            intent_similarity_threshold=float(os.getenv("INTENT_SIMILARITY_THRESHOLD", "0.0")),
+            llm_timeout=float(os.getenv("LLM_TIMEOUT", "20")),
+            video_timeout=float(os.getenv("VIDEO_TIMEOUT", "10")),
+            query_deadline=float(os.getenv("QUERY_DEADLINE", "30")),
+            llm_hedge_delay=float(os.getenv("LLM_HEDGE_DELAY", "0")),
+            max_chart_artifacts=int(os.getenv("MAX_CHART_ARTIFACTS", "10")),
+            nexon_api_base=os.getenv("NEXON_API_BASE", "https://open.api.nexon.com"),
+            youtube_api_base=os.getenv("YOUTUBE_API_BASE", "https://www.googleapis.com/youtube/v3"),
+            openai_base_url=os.getenv("OPENAI_BASE_URL") or None,
+            stats_store_path=os.getenv("STATS_STORE_PATH", ".cache/stats.sqlite3"),
+            stats_store_ttl=float(os.getenv("STATS_STORE_TTL", str(24 * 60 * 60))),
+            http_timeout=float(os.getenv("HTTP_TIMEOUT", "10")),
+            http_retries=int(os.getenv("HTTP_RETRIES", "2")),
+            http_backoff=float(os.getenv("HTTP_BACKOFF", "0.2")),
+            circuit_breaker_threshold=int(os.getenv("CIRCUIT_BREAKER_THRESHOLD", "5")),
+            circuit_breaker_cooldown=float(os.getenv("CIRCUIT_BREAKER_COOLDOWN", "30")),
+            prefetch_concurrency=int(os.getenv("PREFETCH_CONCURRENCY", "2")),
+            prefetch_budget=int(os.getenv("PREFETCH_BUDGET", "6")),
+            max_history_messages=int(os.getenv("MAX_HISTORY_MESSAGES", "50")),
+            history_spill_dir=os.getenv("HISTORY_SPILL_DIR", ""),
+            prompt_examples=int(os.getenv("PROMPT_EXAMPLES", "5")),
+            prompt_token_budget=int(os.getenv("PROMPT_TOKEN_BUDGET", "800")),
+            prompt_selector=os.getenv("PROMPT_SELECTOR", "lexical"),
+            structured_output=os.getenv("STRUCTURED_OUTPUT", "").lower() in ("1", "true", "yes"),
+            metrics_port=int(os.getenv("METRICS_PORT", "0")),
+            metrics_host=os.getenv("METRICS_HOST", "127.0.0.1"),
+            debug_panel=os.getenv("DEBUG_PANEL", "").lower() in ("1", "true", "yes"),
         )
         return cls(config)
 
@@ -104,251 +1746,522 @@ class Assistant:
         """
         self.config = config
         # YouTube API 엔드포인트 URL 설정
-        self.search_url = "https://www.googleapis.com/youtube/v3/search"
-        self.video_url = "https://www.googleapis.com/youtube/v3/videos"
-        self.position_url = "https://open.api.nexon.com/static/fconline/meta/spposition.json"
-        self.spid_url = "https://open.api.nexon.com/static/fconline/meta/spid.json"
-        self.ranker_url = "https://open.api.nexon.com/fconline/v1/ranker-stats"
-        self.match_url = "https://open.api.nexon.com/static/fconline/meta/matchtype.json"
-        self.seasonid_url = "https://open.api.nexon.com/static/fconline/meta/seasonid.json"
-        
+        self.search_url = f"{config.youtube_api_base}/search"
+        self.video_url = f"{config.youtube_api_base}/videos"
+        # Nexon API 엔드포인트 URL 설정
+        self.position_url = f"{config.nexon_api_base}/static/fconline/meta/spposition.json"
+        self.spid_url = f"{config.nexon_api_base}/static/fconline/meta/spid.json"
+        self.ranker_url = f"{config.nexon_api_base}/fconline/v1/ranker-stats"
+        self.match_url = f"{config.nexon_api_base}/static/fconline/meta/matchtype.json"
+        self.seasonid_url = f"{config.nexon_api_base}/static/fconline/meta/seasonid.json"
+
+        # 연결 풀을 공유하는 HTTP 클라이언트 (Nexon API 키 할당량에 맞춰 속도 제한)
+        self.http = HttpClient.shared(
+            config.nexon_concurrency, timeout=config.http_timeout, retries=config.http_retries,
+            backoff=config.http_backoff, breaker_threshold=config.circuit_breaker_threshold,
+            breaker_cooldown=config.circuit_breaker_cooldown)
+        self.http.set_rate_limit(self.ranker_url, config.nexon_rate_limit, config.nexon_rate_burst)
+
+        # 메타데이터 캐시 (프로세스 전역 공유)
+        self.metadata = MetadataCache.shared(config.metadata_cache_dir, config.metadata_ttl, self.http)
+
+        # YouTube 검색/통계 캐시 (프로세스 전역 공유)
+        self.youtube_cache = YouTubeCache.shared(
+            config.youtube_cache_size, config.youtube_search_ttl, config.youtube_stats_ttl)
+
+        # 질의 분류 결과 캐시 (프로세스 전역 공유, 디스크 저장)
+        self.intent_cache = IntentCache.shared(
+            config.intent_cache_path, config.intent_cache_size, config.intent_cache_ttl)
+        self._embeddings = None  # 유사도 캐시를 켤 때만 생성
+
+        # 규칙 기반 빠른 분류기
+        # (적중률을 프로세스 전체에서 집계하기 위해 하나만 사용)
+        self.router = process_singleton("IntentRouter", IntentRouter)
+
+        # 미리 수집한 선수 통계 저장소 (프로세스 전역 공유)
+        self.stats_store = StatsStore.shared(config.stats_store_path) if config.stats_store_path else None
+
+        # 시즌/매치 선택 중 통계 미리 조회 (프로세스 전역 공유, 동시 실행 수 제한)
+        self.prefetcher = (StatsPrefetcher.shared(config.prefetch_concurrency, 10 * 60)
+                           if config.prefetch_concurrency > 0 else None)
+
+        # 캐시 적중률 (계측 지표를 내보낼 때마다 계산)
+        m = metrics()
+        m.register_gauge("cache_hit_ratio", lambda: cache_hit_ratio(self.youtube_cache.search), cache="youtube_search")
+        m.register_gauge("cache_hit_ratio", lambda: cache_hit_ratio(self.youtube_cache.stats), cache="youtube_stats")
+        m.register_gauge("cache_hit_ratio", lambda: cache_hit_ratio(self.intent_cache.exact), cache="intent_exact")
+        m.register_gauge("cache_hit_ratio", lambda: self.router.hit_rate, cache="intent_router")
+        m.register_gauge("youtube_quota_units", lambda: self.youtube_cache.ledger.report()["spent"], kind="spent")
+        m.register_gauge("youtube_quota_units", lambda: self.youtube_cache.ledger.report()["saved"], kind="saved")
+
+        # LLM 체인은 처음 사용할 때 만듦 (LangChain import 지연)
+        self._chain = None
+        self._chain_lock = threading.Lock()
+
+    @property
+    def chain(self):
+        """
+        프롬프트 -> LLM -> 출력 파서 체인 (처음 접근할 때 생성)
+        """
+        if self._chain is None:
+            with self._chain_lock:
+                if self._chain is None:
+                    self._chain = self._build_chain()
+        return self._chain
+
+    @chain.setter
+    def chain(self, chain):
+        self._chain = chain
+
+    def _build_chain(self):
+        config = self.config
+        started = time.perf_counter()
+        PromptTemplate = _lazy_import("langchain_core.prompts").PromptTemplate  # 프롬프트 템플릿을 생성하고 관리하기 위한 클래스
+        ChatOpenAI = _lazy_import("langchain_openai").ChatOpenAI  # OpenAI의 GPT 모델을 사용하기 위한 인터페이스
+        RunnableSequence = _lazy_import("langchain_core.runnables").RunnableSequence  # 여러 컴포넌트를 순차적으로 실행하기 위한 클래스
+        JsonOutputParser = _lazy_import("langchain_core.output_parsers").JsonOutputParser  # LLM의 출력을 JSON 형식으로 파싱하는 도구
+        RunnableLambda = _lazy_import("langchain_core.runnables").RunnableLambda  # 일반 함수를 체인 단계로 사용하기 위한 클래스
 
         # LangChain의 ChatOpenAI 모델 초기화
         self.llm = ChatOpenAI(
-            temperature=config.temperature, model=config.llm_model, openai_api_key=config.openai_api_key)
-
-        # JSON 출력 파서 설정
-        self.output_parser = JsonOutputParser(pydantic_object=AgentAction)
+            temperature=config.temperature, model=config.llm_model, openai_api_key=config.openai_api_key,
+            base_url=config.openai_base_url, callbacks=[token_usage_handler()])
+
+        # 질의와 비슷한 예시만 골라 넣는 선택기
+        self.example_selector = FewShotSelector(
+            EXAMPLE_BANK, embed=self._embed if config.prompt_selector == "embedding" else None)
+
+        if config.structured_output:
+            # 함수 호출로 AgentAction 형식의 응답을 강제 (형식 안내문이 필요 없고 잘못된 JSON이 나올 수 없음)
+            self.output_parser = None
+            format_instructions = ""
+            llm = self.llm.with_structured_output(agent_action_model(), method="function_calling")
+            last = RunnableLambda(lambda action: action.model_dump() if hasattr(action, "model_dump") else action.dict())
+        else:
+            # JSON 출력 파서 설정
+            self.output_parser = JsonOutputParser(pydantic_object=agent_action_model())
+            format_instructions = FORMAT_INSTRUCTIONS
+            llm = self.llm
+            last = self.output_parser
 
         # 프롬프트 템플릿 설정
         # 이 템플릿은 AI가 질의를 어떻게 처리할지 지시합니다
         self.prompt = PromptTemplate(
-            input_variables=["input"],  # 템플릿에서 사용할 변수들
-            partial_variables={
-                "format_instructions": self.output_parser.get_format_instructions()},
-            template="""## FC Online 관련 정보 검색 프롬프트 규칙
-
-### 1. FC Online 게임 관련 질의인지 확인
-**FC Online과 관련된 키워드 예시:**
-- 축구 선수 이름: 손흥민, 메시, 호날두 등
-- 게임 관련 키워드: FC Online, Nexon, 선수 강화, 포지션 추천, 전술 공략 등
-- 줄임말: "피파", "피파 온라인" 등
-
-**판단 기준:**
-1. 키워드에 Nexon의 FC Online 게임 또는 관련 콘텐츠가 포함되어 있어야 함.
-2. **"피파"**라는 단어가 질문에 포함될 경우, 실제 축구가 아닌 FC Online 관련 맥락으로 판단:
-   - "피파 온라인"으로 구체화된 경우 FC Online 관련으로 확실히 판단.
-   - "피파" 단독일 경우, **다음 키워드와 동반**되는지 확인:
-     - 선수 이름
-     - 전술, 포지션, 공략, 활용법 등 게임 맥락 키워드
-   - "피파"와 동반된 키워드가 없으면 **FC Online 외의 질의로 판단**.
-3. 사용자의 질문이 FC Online 게임 외 다른 분야(예: 실제 축구 경기 분석, 관련이 아예 없는 질문)일 경우:
-   - `action`: `"not_supported"`
-   - `search_keyword`: `""`
-
----
-
-### 2. 특정 선수 경기 종합 통계와 관련된지 확인
-**동작 우선순위:**  
-1. 질문에 **선수 이름**이 포함되고, 통계 키워드가 존재하면 반드시 `"additional_input"`로 판단.  
-2. 통계 키워드가 없는 경우에만 동영상 관련 키워드("search_video")를 분석.  
-
-**동작:**  
-  - `action`: `"additional_input"`  
-  - `search_keyword`: 선수 이름 (반드시 입력 내에 있는 이름과 완전히 동일해야함)
-
----
-
-### 3. 유튜브 검색 여부 판단
-**판단 기준:**
-- 질문에 **선수 이름**이 포함되거나 **영상 관련 키워드**가 등장하면 동영상 검색으로 판단
-- 동영상 검색 키워드:
-  - "공략"
-  - "활용법"
-  - "추천 영상"
-  - "전술 강좌"
-
-**동작:**  
-  - `action`: `"search_video"`  
-  - `search_keyword`: 최적화된 검색 키워드 작성
-
----
-
-### 4. 우선순위 설정
-1. 특정 선수 통계 관련 질의가 있는 경우 `"additional_input"`로 우선 판단.
-2. 동영상 검색 키워드가 있는 경우 `"search_video"`로 처리.
-3. 위 조건에 해당하지 않으면 `"not_supported"`.
-
----
-
-## 질의 분석 예시
-
-### 질의:
-1. "게임 내 로날트 쿠만 경기 평균 스탯 알려줘."
-   - **action:** `"additional_input"`
-   - **search_keyword:** `"로날트 쿠만"`
-
-2. "FC Online 메시 활용법 영상 추천해줘."
-   - **action:** `"search_video"`
-   - **search_keyword:** `"FC Online 메시 활용법"`
-
-3. "챔피언스리그 결과 알려줘."
-   - **action:** `"not_supported"`
-   - **search_keyword:** `""`
-
-4. "최신 전술 추천 영상 있어?"
-   - **action:** `"search_video"`
-   - **search_keyword:** `"FC Online 최신 전술 추천"`
-
-5. "게임 내 메시 경기 평균 스탯은?"
-   - **action:** `"additional_input"`
-   - **search_keyword:** `"메시"`
-
-6. "호날두의 강화 후 경기력 분석해줘."
-   - **action:** `"additional_input"`
-   - **search_keyword:** `"호날두"`
-
-7. "피파 메시 경기 평균 스탯 알려줘."
-   - **action:** `"additional_input"`
-   - **search_keyword:** `"메시"`
-
-8. "피파 전술 추천 영상 있어?"
-   - **action:** `"search_video"`
-   - **search_keyword:** `"피파 전술 추천"`
-
-9. "피파 챔피언스리그 결과 알려줘."
-   - **action:** `"not_supported"`
-   - **search_keyword:** `""`
-
-10. "피파 온라인 활용법 추천해줘."
-    - **action:** `"search_video"`
-    - **search_keyword:** `"피파 온라인 활용법"`
-
-11. "피파 경기 분석 부탁해."
-    - **action:** `"not_supported"`
-    - **search_keyword:** `""`
-
-
-분석할 질의: {input}
-
-{format_instructions}""")
+            input_variables=["input", "examples"],  # 템플릿에서 사용할 변수들
+            partial_variables={"format_instructions": format_instructions},
+            template=CLASSIFY_PROMPT)
 
         # 실행 체인 생성
-        # 프롬프트 -> LLM -> 출력 파서로 이어지는 처리 파이프라인
-        self.chain = RunnableSequence(
-            first=self.prompt,
-            middle=[self.llm],
-            last=self.output_parser
+        # 예시 선택 -> 프롬프트 -> LLM -> 출력 파서로 이어지는 처리 파이프라인
+        chain = RunnableSequence(
+            first=RunnableLambda(self._prompt_inputs),
+            middle=[self.prompt, llm],
+            last=last
         )
+        record_startup_timing("build_chain", time.perf_counter() - started)
+        return chain
 
-    def search_stat(self, query: str, season_id, match, seasonid_data, match_data):
+    def _prompt_inputs(self, inputs: dict) -> dict:
+        """
+        질의와 비슷한 예시를 골라 프롬프트 변수를 만듭니다.
+        prompt_token_budget을 넘으면 덜 비슷한 예시부터 빼고, 최종 프롬프트 토큰 수를 계측기에 기록합니다.
+        """
+        query = inputs["input"]
+        examples = self.example_selector.select(query, self.config.prompt_examples)
+        while True:
+            variables = {"input": query, "examples": FewShotSelector.format(examples)}
+            tokens = count_tokens(self.prompt.format(**variables))
+            if tokens <= self.config.prompt_token_budget or not examples:
+                break
+            examples = examples[:-1]
+
+        metrics().inc("prompt_tokens_total", tokens)
+        metrics().inc("prompt_requests_total")
+        logger.debug("분류 프롬프트: 예시 %d개, %d토큰", len(examples), tokens)
+        return variables
+
+    def warm_up(self):
+        """
+        메타데이터와 선수 인덱스를 미리 불러오고 Nexon 연결 풀을 엽니다.
+        실패해도 첫 요청 때 다시 시도하므로 예외를 밖으로 던지지 않습니다.
+        """
+        try:
+            for url in (self.seasonid_url, self.match_url, self.position_url, self.spid_url):
+                self.metadata.get(url)
+            self.player_index()
+        except requests.RequestException as e:
+            logger.warning("메타데이터 미리 불러오기 실패: %s", e)
 
-        season_id = next(
-            (season["seasonId"] for season in seasonid_data if season["className"]
-            == season_id),
-            None
-        )
+        # LLM 체인은 백그라운드에서 만들어 첫 화면 표시를 막지 않음
+        threading.Thread(target=self._warm_chain, daemon=True).start()
 
-        match = next(
-            (matchs["matchtype"] for matchs in match_data if matchs["desc"]
-            == match),
-            None
-        )
+    def _warm_chain(self):
+        try:
+            self.chain
+            count_tokens("")  # 토큰 인코더도 미리 불러옴
+        except Exception as e:
+            logger.warning("LLM 체인 미리 만들기 실패: %s", e)
 
-        # 폼 제출 후 선택된 시즌 ID와 매치 타입 출력(디버깅)
-        print(f"선택된 시즌 ID: {season_id}, 매치 타입: {match}")
+    def player_index(self) -> PlayerIndex:
+        """
+        spid 메타데이터로 만든 선수 인덱스 (메타데이터가 갱신될 때만 다시 만듦)
+        """
+        return self.metadata.get_derived(self.spid_url, PlayerIndex)
 
-        # 추가 작업 (예: API 요청)
-        # GET 요청으로 JSON 데이터 가져오기(포지션 데이터)
-        response = requests.get(self.position_url)
-        response.raise_for_status()  # 요청 실패 시 예외 발생
-        position_data = response.json()  # JSON 데이터를 파싱
+    def metadata_index(self, url: str, data, builder) -> dict:
+        """
+        메타데이터 표시 이름 -> id 인덱스
+        캐시의 메타데이터와 같은 데이터면 갱신될 때만 다시 만들고, 다른 데이터가 주어지면 그 데이터로 만듭니다.
+        """
+        if data is None or data is self.metadata.get(url):
+            return self.metadata.get_derived(url, builder)
+        return builder(data)
 
-        # GET 요청으로 JSON 데이터 가져오기(선수 id 데이터)
-        response = requests.get(self.spid_url)
-        response.raise_for_status()  # 요청 실패 시 예외 발생
-        spid_data = response.json()  # JSON 데이터를 파싱
+    def search_stat(self, query: str, season_id, match, seasonid_data, match_data):
 
-        # 선수 아이디 추출
-        found_player = False  # 선수 정보 찾았는지 여부를 추적할 변수
+        # 표시 이름을 id로 변환 (인덱스 조회)
+        season_id = self.metadata_index(self.seasonid_url, seasonid_data, index_seasons).get(season_id)
+        match = self.metadata_index(self.match_url, match_data, index_match_types).get(match)
 
-        cumulative_result = {}
-        n = 0
+        # 폼 제출 후 선택된 시즌 ID와 매치 타입 (디버깅)
+        logger.debug("선택된 시즌 ID: %s, 매치 타입: %s", season_id, match)
+        if self.prefetcher is not None and match is not None:
+            self.prefetcher.record_choice(match)
 
-        for i in range(0, len(spid_data)):
-            if query == spid_data[i]['name'] and season_id == int(str(spid_data[i]['id'])[:3]):
-                id = spid_data[i]['id']
-                n += 1
+        matches = self.player_index().ambiguous(query)
+        if matches:
+            return ambiguous_message(query, matches)
 
-        if n == 0:
+        try:
+            stats = self.fetch_player_stats(query, season_id, match)
+        except UpstreamDegraded as e:
+            logger.warning("선수 통계 조회 실패: %s", e)
+            return nexon_error_message(e)
+        if stats is None:
             return '❎ 입력하신 정보에 일치하는 선수를 찾을 수 없습니다.'
-        
-
-        for i in range(0, len(position_data)):  # 모든 포지션에 대해 반복
-            position = position_data[i]['spposition']
-            player_array = [{"id": str(id), "po": position}]
 
-            # JSON 배열을 문자열로 변환
-            player_string = json.dumps(player_array)
-            print(player_string)
+        with metrics().span("plot_render"):
+            png = render_chart(self.plot_stats(stats))
+        return ChartArtifact(png=png, summary=stats.summary_text())
 
-            # 요청 헤더
-            headers = {
-                'x-nxopen-api-key': self.config.nexon_api_key
-            }
-
-            # 쿼리 파라미터
-            params = {
-                'matchtype': match,
-                'players': player_string
-            }
+    def search_stats_many(self, names: List[str], season_id, match, seasonid_data, match_data):
+        """
+        여러 선수의 통계를 같은 시즌/매치 타입으로 함께 조회해 하나의 비교 그래프로 그립니다.
+        통계가 없는 선수는 그래프에서 빼고 요약에 표시합니다.
+        """
+        # 표시 이름을 id로 변환 (인덱스 조회)
+        season_id = self.metadata_index(self.seasonid_url, seasonid_data, index_seasons).get(season_id)
+        match = self.metadata_index(self.match_url, match_data, index_match_types).get(match)
+        logger.debug("비교 선수: %s, 시즌 ID: %s, 매치 타입: %s", names, season_id, match)
+        if self.prefetcher is not None and match is not None:
+            self.prefetcher.record_choice(match)
+
+        index = self.player_index()
+        ambiguous = [ambiguous_message(name, index.ambiguous(name)) for name in names if index.ambiguous(name)]
+        if ambiguous:
+            return "\n\n".join(ambiguous)
 
-            response = requests.get(self.ranker_url, headers=headers, params=params)
+        try:
+            players = self.fetch_players_stats(names, season_id, match)
+        except UpstreamDegraded as e:
+            logger.warning("선수 통계 조회 실패: %s", e)
+            return nexon_error_message(e)
+        found = [(name, stats) for name, stats in players if stats is not None]
+        if not found:
+            return '❎ 입력하신 정보에 일치하는 선수를 찾을 수 없습니다.'
 
-            # 결과 확인
-            if response.status_code == 200:
-                try:
-                    found_player = True  # 선수를 찾았다고 표시
-                    status_data = response.json()
+        with metrics().span("plot_render"):
+            png = render_chart(self.plot_comparison(found))
+        sections = [f"**{name}** · {stats.summary_text()}" for name, stats in found]
+        missing = [name for name, stats in players if stats is None]
+        if missing:
+            sections.append(f"❎ 선택한 시즌/매치에 통계가 없는 선수: {', '.join(missing)}")
+        return ChartArtifact(png=png, summary="\n\n".join(sections))
 
-                    status = status_data[0]['status']
-                    match_count = status["matchCount"]
+    def fetch_player_stats(self, query: str, season_id: int, match: int) -> Union[PlayerStats, None]:
+        """
+        선수 이름/시즌 id/매치 타입으로 포지션별 랭커 통계를 조회합니다. 선수나 데이터가 없으면 None을 반환하고,
+        외부 API 장애로 조회하지 못하면 UpstreamDegraded를 던집니다.
+        """
+        return self.fetch_players_stats([query], season_id, match)[0][1]
 
-                    for key, value in status.items():
-                        if isinstance(value, (int, float)) and key != 'matchCount':
-                            cumulative_result.setdefault(key, []).append(value)
-                except:
-                    found_player = False
+    def fetch_players_stats(self, names: List[str], season_id: int,
+                            match: int) -> List[Tuple[str, Union[PlayerStats, None]]]:
+        """
+        여러 선수의 통계를 함께 조회해 [(이름, PlayerStats 또는 None), ...]을 입력 순서대로 반환합니다.
+        인덱스는 한 번만 불러오고, 미리 조회된 선수를 뺀 나머지는 한 번의 묶음 요청(load_ranker_stats)으로 조회합니다.
+        """
+        # 포지션 메타데이터 (캐시에서 가져옴)
+        positions = [position['spposition'] for position in self.metadata.get(self.position_url)]
+
+        # 선수 아이디 추출 (인덱스 조회, 이름마다 가장 잘 맞는 카드 하나)
+        with metrics().span("player_lookup"):
+            index = self.player_index()
+            spids = {name: (index.find(name, season_id) or [None])[0] for name in names}
+
+        # 미리 조회된 결과를 먼저 쓰고, 나머지 선수의 모든 포지션은 저장소 또는 묶음 요청으로 함께 조회
+        results: Dict[int, Dict[int, dict]] = {}
+        for spid in dict.fromkeys(spid for spid in spids.values() if spid is not None):
+            prefetched = self._take_prefetched(spid, match)
+            if prefetched is not None:
+                results[spid] = prefetched
+        remaining = [spid for spid in dict.fromkeys(spids.values()) if spid is not None and spid not in results]
+        if remaining:
+            results.update(self.load_ranker_stats(remaining, match, positions))
+
+        players = []
+        for name in names:
+            # 포지션 순서대로 결과를 합침
+            found = results.get(spids[name]) or {}
+            statuses = [(position, found[position]) for position in positions if position in found]
+            players.append((name, PlayerStats.from_statuses(statuses) if statuses else None))
+        return players
+
+    def _take_prefetched(self, spid: int, match: int) -> Union[Dict[int, dict], None]:
+        """
+        미리 조회 중이거나 끝난 결과가 있으면 기다렸다가 반환합니다. 없거나 실패했으면 None을 반환합니다.
+        """
+        future = self.prefetcher.take((spid, match)) if self.prefetcher is not None else None
+        if future is None:
+            metrics().inc("prefetch_total", result="miss")
+            return None
+        try:
+            results = future.result()
+        except Exception:
+            metrics().inc("prefetch_total", result="failed")
+            return None
+        metrics().inc("prefetch_total", result="hit")
+        return results
+
+    def prefetch_stats(self, keyword: str, season_id: Union[int, None] = None) -> Dict[tuple, Future]:
+        """
+        선수 이름이 정해지면 그 선수가 실제로 가진 시즌의 카드에 대해 랭커 통계를 미리 조회합니다. (쉼표로 구분된 여러 선수도 가능)
+        자주 고르는 매치 타입부터 prefetch_budget개까지 예약하고, season_id가 주어지면 그 시즌만 조회합니다.
+        {(spid, 매치 타입): Future}를 반환합니다. (선택이 바뀌면 cancel_prefetch로 취소)
+        """
+        if self.prefetcher is None or not keyword:
+            return {}
+        try:
+            index = self.player_index()
+            positions = [position['spposition'] for position in self.metadata.get(self.position_url)]
+            matches = self.prefetcher.rank_matches([match['matchtype'] for match in self.metadata.get(self.match_url)])
+        except requests.RequestException:
+            return {}
 
-        if not found_player:
-            return '❎ 입력하신 정보에 일치하는 선수를 찾을 수 없습니다.'
+        # search_stat과 같은 카드(이름이 가장 잘 맞는 spid)를 선수/시즌별로 하나씩 (비교 질의는 선수 여러 명)
+        spids = []
+        for name in player_names(keyword):
+            if index.ambiguous(name):
+                continue  # 어떤 선수인지 정해지지 않으면 미리 조회하지 않음
+            seasons = index.seasons(name)
+            if season_id is not None:
+                seasons = {season_id: seasons.get(season_id, [])}
+            spids.extend(ids[0] for ids in seasons.values() if ids)
+        futures: Dict[tuple, Future] = {}
+        for match in matches:
+            for spid in spids:
+                if len(futures) >= self.config.prefetch_budget:
+                    return futures
+                futures[(spid, match)] = self.prefetcher.submit(
+                    (spid, match), lambda spid=spid, match=match: self.load_ranker_stats([spid], match, positions)[spid])
+        return futures
+
+    @staticmethod
+    def cancel_prefetch(futures: Dict[tuple, Future], keep=()):
+        """
+        아직 시작하지 않은 미리 조회를 취소합니다. (keep에 있는 키는 그대로 둠)
+        """
+        for key, future in futures.items():
+            if key not in keep and future.cancel():
+                metrics().inc("prefetch_total", result="cancelled")
 
-        # 그래프 시각화
-        # 키와 값 분리
-        status_data = cumulative_result
-        keys = ['슛', '유효슛', '어시스트', '골', '드리블 시도', '드리블 성공', '패스 시도', '패스 성공', '블록', '태클']
-        values = list(status_data.values())
-        values.pop(4)
+    def plot_stats(self, stats: PlayerStats):
+        """
+        지표별 포지션 분포를 박스플롯으로 그립니다.
+        """
+        np = _lazy_import("numpy")
+        plt = load_pyplot()  # 한글 폰트는 처음 불러올 때 한 번만 설정
 
-        # 한글 폰트 설정 (Windows에서 Malgun Gothic 사용)
-        rc('font', family='Malgun Gothic')
+        fields = stats.labeled_fields()
+        values = [column[~np.isnan(column)] for column in (stats.column(f) for f in fields)]
+        labels = [STAT_LABELS[f] for f in fields]
 
         # 박스플롯 그리기
         fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.boxplot(values, labels=keys)
+        ax.boxplot(values)
+        ax.set_xticks(range(1, len(labels) + 1))
+        ax.set_xticklabels(labels)
+
+        # 그래프 꾸미기
+        ax.set_title("선수 평균 통계", fontsize=16)
+        ax.set_xlabel("카테고리", fontsize=12)
+        ax.set_ylabel("값", fontsize=12)
+        fig.tight_layout()
+
+        return fig
+
+    def plot_comparison(self, players: List[Tuple[str, PlayerStats]]):
+        """
+        선수별 지표 가중 평균을 묶은 막대그래프로 그립니다.
+        """
+        np = _lazy_import("numpy")
+        plt = load_pyplot()
+
+        summaries = [(name, stats.summary()) for name, stats in players]
+        fields = [f for f in STAT_LABELS if any(f in summary and not np.isnan(summary[f]["mean"])
+                                                for _, summary in summaries)]
+        x = np.arange(len(fields))
+        width = 0.8 / len(summaries)
+
+        # 지표마다 선수 수만큼 막대를 나란히 그리기 (값이 없는 지표는 0)
+        fig, ax = plt.subplots(figsize=(max(10, len(fields) * len(summaries) * 0.45), 6))
+        for i, (name, summary) in enumerate(summaries):
+            means = [summary[f]["mean"] if f in summary else np.nan for f in fields]
+            ax.bar(x + (i - (len(summaries) - 1) / 2) * width, np.nan_to_num(means), width, label=name)
+        ax.set_xticks(x)
+        ax.set_xticklabels([STAT_LABELS[f] for f in fields])
 
         # 그래프 꾸미기
-        plt.title("선수 평균 통계", fontsize=16)
-        plt.xlabel("카테고리", fontsize=12)
-        plt.ylabel("값", fontsize=12)
-        # plt.xticks(rotation=45, ha='right')  # X축 라벨 회전
-        plt.tight_layout()
+        ax.set_title("선수 평균 통계 비교", fontsize=16)
+        ax.set_xlabel("카테고리", fontsize=12)
+        ax.set_ylabel("경기당 평균", fontsize=12)
+        ax.legend()
+        fig.tight_layout()
 
         return fig
-        
-    def season_input_(self, seasonid_data):
 
-        season_options = [season["className"] for season in seasonid_data if season["className"]]  # 빈 값 제거
+    def load_ranker_stats(self, spids: List[int], match: int, positions: List[int],
+                          max_age: Union[float, None] = None) -> Dict[int, Dict[int, dict]]:
+        """
+        여러 선수의 포지션별 랭커 통계를 {spid: {포지션: status}}로 반환합니다.
+        저장소에 max_age(기본 stats_store_ttl)초 안의 데이터가 있는 선수는 저장소에서 읽고,
+        나머지 선수만 묶음 요청으로 한 번에 조회한 뒤 저장소에 저장합니다.
+        """
+        if max_age is None:
+            max_age = self.config.stats_store_ttl
+        store = self.stats_store if match is not None else None
+        results: Dict[int, Dict[int, dict]] = {}
+        missing = []
+        for spid in spids:
+            stored = store.get(spid, match, positions, max_age) if store is not None else None
+            if stored is None:
+                missing.append(spid)
+            else:
+                results[spid] = stored
+        metrics().inc("stats_store_total", len(spids) - len(missing), result="hit")
+        if not missing:
+            return results
+        metrics().inc("stats_store_total", len(missing), result="miss")
+
+        with metrics().span("ranker_fanout"):
+            live, failed, error = self._get_ranker_statuses(
+                [(spid, position) for spid in missing for position in positions], match)
+        for spid in missing:
+            statuses = {position: live[(spid, position)] for position in positions if (spid, position) in live}
+            results[spid] = statuses
+            # 실패한 묶음에 걸린 선수는 빠진 포지션을 "데이터 없음"으로 저장하지 않음
+            if any((spid, position) in failed for position in positions):
+                continue
+            # 응답이 하나도 없으면 요청 실패일 수 있으므로 저장하지 않음
+            if statuses and store is not None:
+                store.put(spid, match, {position: statuses.get(position) for position in positions})
+        # 성공한 묶음은 저장한 뒤, 일부라도 실패했으면 "선수 없음"과 구분되도록 오류를 전달
+        if error is not None:
+            raise error
+        return results
+
+    def _get_ranker_statuses(self, pairs: List[tuple],
+                             match) -> Tuple[Dict[tuple, dict], set, Union[UpstreamDegraded, None]]:
+        """
+        여러 (spid, 포지션) 쌍의 랭커 평균 통계를 묶음 요청으로 조회합니다.
+        ranker_batch_size 단위로 나눈 묶음들을 동시에 보내고, ({(spid, 포지션): status}, 실패한 쌍, 첫 오류)를 반환합니다.
+        데이터가 없는 쌍은 결과에 포함되지 않고, 실패한 묶음의 쌍은 실패한 쌍에 들어갑니다.
+        """
+        size = max(1, self.config.ranker_batch_size)
+        batches = [pairs[i:i + size] for i in range(0, len(pairs), size)]
+
+        def fetch(batch):
+            try:
+                return self._get_ranker_batch(batch, match), None
+            except UpstreamDegraded as e:
+                return {}, e
+
+        results: Dict[tuple, dict] = {}
+        failed = set()
+        error = None
+        for batch, (batch_result, batch_error) in zip(batches, self.http.map(fetch, batches)):
+            if batch_error is not None:
+                failed.update(batch)
+                error = error or batch_error
+            results.update(batch_result)
+        return results, failed, error
+
+    def _get_ranker_batch(self, pairs: List[tuple], match) -> Dict[tuple, dict]:
+        """
+        한 번의 ranker-stats 호출로 여러 (spid, 포지션) 쌍을 조회합니다.
+        묶음이 너무 크다고 거절(400)되면 반으로 나눠 다시 요청합니다.
+        """
+        # JSON 배열을 문자열로 변환
+        player_string = json.dumps([{"id": str(spid), "po": position} for spid, position in pairs])
+
+        # 요청 헤더
+        headers = {
+            'x-nxopen-api-key': self.config.nexon_api_key
+        }
+
+        # 쿼리 파라미터
+        params = {
+            'matchtype': match,
+            'players': player_string
+        }
+
+        # 외부 API 장애(UpstreamDegraded)와 거절(UpstreamRejected)은 "데이터 없음"과 구분되도록 그대로 전달
+        response = self.http.get(self.ranker_url, headers=headers, params=params)
+        if response.status_code == 400 and len(pairs) > 1:
+            half = len(pairs) // 2
+            results = self._get_ranker_batch(pairs[:half], match)
+            results.update(self._get_ranker_batch(pairs[half:], match))
+            return results
+        if response.status_code != 200:
+            raise UpstreamRejected(f"ranker-stats 응답 {response.status_code}", response=response)
+        try:
+            entries = response.json()
+        except ValueError as e:
+            raise UpstreamRejected(f"ranker-stats 응답을 해석할 수 없음: {e}", response=response) from e
+        if not isinstance(entries, list):
+            raise UpstreamRejected("ranker-stats 응답 형식이 올바르지 않음", response=response)
+
+        # 응답 항목을 spId/spPosition으로 요청한 쌍에 다시 매핑
+        results = {}
+        requested = set(pairs)
+        for entry in entries:
+            try:
+                key = (int(entry['spId']), int(entry['spPosition']))
+                if key in requested and isinstance(entry.get('status'), dict):
+                    results[key] = entry['status']
+            except (KeyError, ValueError, TypeError):
+                continue
+        return results
+
+    def season_options(self, keyword: str, seasonid_data) -> List[str]:
+        """
+        선수가 실제로 카드를 가진 시즌의 표시 이름 목록 (seasonid.json 순서, 여러 선수면 한 명이라도 가진 시즌)
+        """
+        index = self.player_index()
+        available = {season_id for name in player_names(keyword) for season_id in index.seasons(name)}
+        return [season["className"] for season in seasonid_data
+                if season["className"] and season["seasonId"] in available]  # 빈 값 제거
+
+    def season_input_(self, seasonid_data, keyword: Union[str, None] = None):
+
+        if keyword is None:
+            season_options = [season["className"] for season in seasonid_data if season["className"]]  # 빈 값 제거
+        else:
+            season_options = self.season_options(keyword, seasonid_data)
+
+        # 다른 선수를 검색해 이전에 고른 시즌이 목록에 없으면 선택 초기화
+        if st.session_state.get('season') not in season_options:
+            st.session_state.pop('season', None)
 
         # 폼 제출 후 선택된 값을 session_state에 저장
         st.session_state.selected_season = st.selectbox("시즌을 선택하세요:", season_options, None, key='season')
@@ -367,6 +2280,20 @@ class Assistant:
             return True
 
 
+    def _update_prefetch(self, keyword: str, season_name, seasonid_data):
+        """
+        선수 이름이나 선택한 시즌이 바뀌었을 때만 미리 조회를 다시 예약하고, 더 이상 필요 없는 예약은 취소합니다.
+        """
+        target = (keyword, season_name)
+        job = st.session_state.get("prefetch_job")
+        if job is not None and job["target"] == target:
+            return
+        season_id = self.metadata_index(self.seasonid_url, seasonid_data, index_seasons).get(season_name)
+        futures = self.prefetch_stats(keyword, season_id)
+        if job is not None:
+            self.cancel_prefetch(job["futures"], keep=futures)
+        st.session_state.prefetch_job = {"target": target, "futures": futures}
+
     def additional_input(self, keyword: str, seasonid_data, match_data):
 
         # 상태 초기화
@@ -375,14 +2302,33 @@ class Assistant:
         if "selected_match" not in st.session_state:
             st.session_state.selected_match = None
 
-        # 시즌과 매치 선택
-        self.season_input_(seasonid_data)
+        # 선수가 가진 카드가 하나도 없으면 시즌을 고르게 하지 않음
+        names = player_names(keyword)
+        index = self.player_index()
+        if not any(index.seasons(name) for name in names):
+            st.warning(f"❎ '{keyword}' 선수의 카드를 찾을 수 없습니다.")
+            return
+
+        # 여러 선수와 일치하는 이름이 있으면 카드를 섞지 않고 전체 이름을 다시 묻기
+        ambiguous = [ambiguous_message(name, index.ambiguous(name)) for name in names if index.ambiguous(name)]
+        if ambiguous:
+            st.warning("\n\n".join(ambiguous))
+            return
+
+        # 시즌과 매치 선택 (선수가 카드를 가진 시즌만 표시)
+        self.season_input_(seasonid_data, keyword)
+
+        # 시즌/매치를 고르는 동안 통계를 미리 조회 (선택한 시즌이 있으면 그 시즌만)
+        self._update_prefetch(keyword, st.session_state.selected_season, seasonid_data)
         if st.session_state.selected_season:
             self.match_input_(match_data)
             if st.session_state.selected_match:
                 if st.button("결과 확인"):
-                    # 새로운 값을 기반으로 search_stat 호출 (return 없이)
-                    result = self.search_stat(keyword, st.session_state.selected_season, st.session_state.selected_match, seasonid_data, match_data)
+                    # 새로운 값을 기반으로 search_stat 호출 (비교 질의는 search_stats_many)
+                    if len(names) > 1:
+                        result = self.search_stats_many(names, st.session_state.selected_season, st.session_state.selected_match, seasonid_data, match_data)
+                    else:
+                        result = self.search_stat(keyword, st.session_state.selected_season, st.session_state.selected_match, seasonid_data, match_data)
 
                     # 결과 출력
                     return result
@@ -390,34 +2336,33 @@ class Assistant:
     
     def search_videos(self, query: str, max_results: int = 5):
         try:
-            # YouTube API 검색 파라미터 설정
-            search_params = {
-                'key': self.config.youtube_api_key,
-                'q': query,
-                'part': 'snippet',
-                'maxResults': max_results,
-                'type': 'video',
-                'order': 'relevance',
-                'regionCode': 'KR',
-                'relevanceLanguage': 'ko'
-            }
-
-            # 검색 API 호출
-            response = requests.get(self.search_url, params=search_params)
-            response.raise_for_status()
-            search_data = response.json()
-
-            if 'items' not in search_data or not search_data['items']:
+            region_code, language = 'KR', 'ko'
+
+            # 정규화된 검색어 + 지역/언어 + 결과 수를 키로 검색 결과 캐시 조회
+            cache_key = (normalize_query(query), region_code, language, max_results)
+            cached = self.youtube_cache.search.get(cache_key)
+            if cached is not None:
+                items, pages = cached
+                self.youtube_cache.ledger.save("search.list", pages)
+            else:
+                items, pages = self._search_video_items(query, max_results, region_code, language)
+                if items:
+                    self.youtube_cache.search.set(cache_key, (items, pages))
+
+            if not items:
                 st.warning("검색 결과가 없습니다.")
                 return
 
+            # 모든 비디오 통계를 캐시 + 묶음 요청으로 조회
+            stats = self._get_videos_stats([item['id']['videoId'] for item in items])
+
             video_list = []
 
             # 각 비디오의 상세 정보 수집
-            for item in search_data['items']:
+            for item in items:
                 try:
                     video_id = item['id']['videoId']
-                    video_stats = self._get_video_stats(video_id)
+                    video_stats = stats.get(video_id, {})
 
                     # 날짜 포맷 변경
                     published_at = datetime.strptime(item['snippet']['publishedAt'], "%Y-%m-%dT%H:%M:%SZ")
@@ -447,28 +2392,243 @@ class Assistant:
             # 가장 좋아요 수가 많은 동영상 임베드
             return video_list
 
+        except UpstreamDegraded as e:
+            logger.warning("YouTube 검색 실패: %s", e)
+            st.error("YouTube API 응답이 원활하지 않습니다. 잠시 후 다시 시도해 주세요.")
         except Exception as e:
             st.error(f"검색 중 오류 발생: {e}")
 
-    def _get_video_stats(self, video_id: str) -> dict:
-        try:
-            params = {
+    def _search_video_items(self, query: str, max_results: int, region_code: str, language: str):
+        """
+        search API를 페이지(최대 50개) 단위로 호출해 videoId가 있는 검색 결과 항목을 모읍니다.
+        (항목 목록, 호출한 페이지 수)를 반환합니다.
+        """
+        items = []
+        pages = 0
+        page_token = None
+
+        while len(items) < max_results:
+            # YouTube API 검색 파라미터 설정
+            search_params = {
                 'key': self.config.youtube_api_key,
-                'id': video_id,
-                'part': 'statistics'
+                'q': query,
+                'part': 'snippet',
+                'maxResults': min(50, max_results - len(items)),
+                'type': 'video',
+                'order': 'relevance',
+                'regionCode': region_code,
+                'relevanceLanguage': language
             }
+            if page_token:
+                search_params['pageToken'] = page_token
 
-            response = requests.get(self.video_url, params=params)
+            # 검색 API 호출
+            with metrics().span("youtube_search"):
+                response = self.http.get(self.search_url, params=search_params)
+            pages += 1
+            self.youtube_cache.ledger.spend("search.list")
             response.raise_for_status()
+            search_data = response.json()
 
-            data = response.json()
-            if data.get('items'):
-                return data['items'][0]['statistics']
-            return {}
+            page_items = [item for item in search_data.get('items') or [] if item.get('id', {}).get('videoId')]
+            if not page_items:
+                break
+            items.extend(page_items)
+
+            page_token = search_data.get('nextPageToken')
+            if not page_token:
+                break
+
+        return items[:max_results], pages
+
+    def _get_videos_stats(self, video_ids: List[str]) -> Dict[str, dict]:
+        """
+        여러 비디오의 통계를 조회합니다. 캐시에 없는 id만 videos API로 요청하며,
+        한 번의 호출에 최대 50개 id를 쉼표로 묶어 보냅니다.
+        """
+        result = {}
+        missing = []
+        for video_id in video_ids:
+            cached = self.youtube_cache.stats.get(video_id)
+            if cached is None:
+                missing.append(video_id)
+            else:
+                result[video_id] = cached
+
+        # 캐시로 아낀 호출 수 (50개 단위)
+        saved_calls = (len(video_ids) + 49) // 50 - (len(missing) + 49) // 50
+        if saved_calls:
+            self.youtube_cache.ledger.save("videos.list", saved_calls)
+
+        for i in range(0, len(missing), 50):
+            try:
+                params = {
+                    'key': self.config.youtube_api_key,
+                    'id': ','.join(missing[i:i + 50]),
+                    'part': 'statistics'
+                }
+
+                with metrics().span("youtube_stats"):
+                    response = self.http.get(self.video_url, params=params)
+                self.youtube_cache.ledger.spend("videos.list")
+                response.raise_for_status()
+
+                data = response.json()
+                for item in data.get('items', []):
+                    statistics = item.get('statistics', {})
+                    self.youtube_cache.stats.set(item['id'], statistics)
+                    result[item['id']] = statistics
+            except Exception as e:
+                st.error(f"비디오 통계 정보 조회 중 오류 발생: {e}")
+        return result
+
+    def _embed(self, text: str) -> list:
+        """
+        질의 임베딩 (유사 질의 캐시용)
+        """
+        if self._embeddings is None:
+            from langchain_openai import OpenAIEmbeddings
+            self._embeddings = OpenAIEmbeddings(openai_api_key=self.config.openai_api_key)
+        return self._embeddings.embed_query(text)
+
+    def _classify_without_llm(self, query: str) -> Union[dict, None]:
+        """
+        규칙 기반 분류기와 분류 캐시로 질의를 분류합니다. 둘 다 해당 없으면 None을 반환합니다.
+        """
+        # 확실한 질의는 규칙으로 바로 분류 (메타데이터를 못 받으면 선수 이름 규칙만 건너뜀)
+        try:
+            index = self.player_index()
+        except requests.RequestException:
+            index = None
+        result = self.router.route(query, index)
+        if result is not None:
+            return result
+
+        threshold = self.config.intent_similarity_threshold
+        embed = self._embed if threshold > 0 else None
+        return self.intent_cache.get(query, embed, threshold)
+
+    def _remember_classification(self, query: str, result: dict):
+        """
+        올바른 형식의 LLM 분류 결과만 캐시에 저장합니다.
+        """
+        if isinstance(result, dict) and result.get("action") in (
+                "additional_input", "compare_stats", "search_video", "not_supported"):
+            embed = self._embed if self.config.intent_similarity_threshold > 0 else None
+            self.intent_cache.set(query, result, embed)
+
+    def classify(self, query: str) -> dict:
+        """
+        질의를 분류합니다. 같은(또는 충분히 비슷한) 질의의 이전 결과가 있으면 LLM을 호출하지 않습니다.
+        """
+        result = self._classify_without_llm(query)
+        if result is None:
+            with metrics().span("llm_classify"):
+                result = self.chain.invoke({"input": query})
+            self._remember_classification(query, result)
+        return result
+
+    async def _to_thread(self, fn, *args):
+        """
+        동기 함수를 스레드에서 실행합니다. Streamlit 실행 컨텍스트를 넘겨서 st.warning 등이 그대로 표시되게 합니다.
+        """
+        from streamlit.runtime.scriptrunner import get_script_run_ctx, add_script_run_ctx
+
+        # 백그라운드 루프에서는 현재 스레드에 컨텍스트가 없으므로 질의를 보낸 화면 스레드의 컨텍스트를 사용
+        ctx = script_run_ctx_var().get() or get_script_run_ctx(suppress_warning=True)
+
+        def run():
+            if ctx is not None:
+                add_script_run_ctx(threading.current_thread(), ctx)
+            return fn(*args)
+
+        return await asyncio.to_thread(run)
+
+    async def _ainvoke_llm(self, query: str) -> dict:
+        """
+        체인을 비동기로 호출합니다. llm_hedge_delay가 지나도 응답이 없으면 같은 요청을 하나 더 보내
+        먼저 성공한 응답을 사용합니다.
+        """
+        delay = self.config.llm_hedge_delay
+        first = asyncio.ensure_future(self.chain.ainvoke({"input": query}))
+        if delay <= 0:
+            return await first
+
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        pending = {first, asyncio.ensure_future(self.chain.ainvoke({"input": query}))}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            # 두 요청 모두 실패하면 마지막 예외를 그대로 전달
+            return next(iter(done)).result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _aclassify(self, query: str) -> dict:
+        result = await self._to_thread(self._classify_without_llm, query)
+        if result is None:
+            with metrics().span("llm_classify"):
+                result = await self._ainvoke_llm(query)
+            await self._to_thread(self._remember_classification, query, result)
+        return result
+
+    async def astream_query(self, query: str):
+        """
+        process_query의 비동기 버전으로, 단계별 결과를 순서대로 내보내는 비동기 제너레이터
+
+        단계마다 제한 시간(llm_timeout, video_timeout)과 전체 제한 시간(query_deadline)을 적용합니다.
+
+        Yields:
+            dict: {"stage": "classified", "action", "search_keyword"} -> 분류가 끝나는 즉시
+                  {"stage": "result", "action", "response"} -> 최종 결과
+                  {"stage": "error", "message"} -> 오류 또는 시간 초과
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.query_deadline
+
+        def remaining(stage_timeout: float) -> float:
+            return max(0.0, min(stage_timeout, deadline - loop.time()))
+
+        try:
+            result = await asyncio.wait_for(self._aclassify(query), remaining(self.config.llm_timeout))
+            action = result["action"]  # 수행할 액션
+            search_keyword = result["search_keyword"]  # 최적화된 검색어
+            yield {"stage": "classified", "action": action, "search_keyword": search_keyword}
+
+            if action == "not_supported":
+                response = self.config.not_supported_message
+            elif action in ("additional_input", "compare_stats"):
+                response = search_keyword
+            elif action == "search_video":
+                # 시간 초과 시 결과만 버리고, 이미 보낸 요청은 백그라운드에서 마무리됨
+                response = await asyncio.wait_for(
+                    self._to_thread(self.search_videos, search_keyword), remaining(self.config.video_timeout))
+            else:
+                raise ValueError(f"알 수 없는 action: {action}")
+
+            yield {"stage": "result", "action": action, "response": response}
+        except asyncio.TimeoutError:
+            yield {"stage": "error", "message": "⏱️ 응답 시간이 초과되었습니다. 잠시 후 다시 시도해주세요."}
         except Exception as e:
-            st.error(f"비디오 통계 정보 조회 중 오류 발생: {e}")
-            return {}
-        
+            yield {"stage": "error", "message": f"처리 중 오류 발생: {e}"}
+
+    async def aprocess_query(self, query: str):
+        """
+        process_query의 비동기 버전. 같은 형식((action, 응답) 또는 에러 메시지)으로 반환합니다.
+        """
+        async for event in self.astream_query(query):
+            if event["stage"] == "result":
+                return event["action"], event["response"]
+            if event["stage"] == "error":
+                return event["message"]
+
     def process_query(self, query: str) -> str:
         """
         사용자 질문을 처리하고 적절한 응답을 생성하는 메인 메서드
@@ -480,8 +2640,8 @@ class Assistant:
             str: 검색 결과 또는 에러 메시지
         """
         try:
-            result = self.chain.invoke({"input": query})
-            print(result)
+            result = self.classify(query)
+            logger.debug("질의 분류 결과: %s", result)
 
             # 분석 결과에서 필요한 정보 추출
             action = result["action"]  # 수행할 액션
@@ -493,7 +2653,7 @@ class Assistant:
                 return action, self.config.not_supported_message
 
             # FC Online 관련 질의인 경우 분기 처리
-            if action == "additional_input":
+            if action in ("additional_input", "compare_stats"):
                 return action, search_keyword
             
             elif action == "search_video":
@@ -503,6 +2663,124 @@ class Assistant:
             st.error(f"처리 중 오류 발생: {e}")
             return f"처리 중 오류 발생: {e}"
 
+class ChatMessage:
+    """
+    대화 기록 한 건 (__slots__로 인스턴스 딕셔너리 없이 보관)
+    kind: "text"(일반 텍스트), "not_supported", "video"(videos), "chart"(PNG 바이트 + 요약 + 시즌/매치)
+    """
+    __slots__ = ("role", "kind", "content", "videos", "chart", "summary", "season", "match")
+
+    def __init__(self, role: str, kind: str = "text", content: str = "", videos: Union[list, None] = None,
+                 chart: Union[bytes, None] = None, summary: str = "", season: Union[str, None] = None,
+                 match: Union[str, None] = None):
+        self.role = role
+        self.kind = kind
+        self.content = content
+        self.videos = videos
+        self.chart = chart
+        self.summary = summary
+        self.season = season
+        self.match = match
+
+    def to_dict(self) -> dict:
+        """
+        디스크 보관용 딕셔너리 (그래프 이미지는 제외)
+        """
+        return {name: getattr(self, name) for name in self.__slots__ if name != "chart"}
+
+
+class ChatHistory:
+    """
+    세션 대화 기록을 최근 maxlen개만 보관하는 링 버퍼
+    가득 차면 가장 오래된 메시지를 spill_path(JSONL)로 옮기고(경로가 없으면 버림),
+    그래프 이미지는 최근 chart_limit개만 남겨 세션 메모리가 대화 길이에 비례해 늘지 않게 합니다.
+    """
+
+    def __init__(self, maxlen: int, chart_limit: int, spill_path: Union[str, None] = None):
+        self.messages: "deque[ChatMessage]" = deque(maxlen=max(1, maxlen))
+        self.chart_limit = chart_limit
+        self.spill_path = spill_path
+        self.spilled = 0  # 링 버퍼에서 밀려난 메시지 수
+
+    def __iter__(self):
+        return iter(self.messages)
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def append(self, message: ChatMessage):
+        if len(self.messages) == self.messages.maxlen:
+            self._spill(self.messages[0])
+        self.messages.append(message)
+        if message.chart is not None:
+            charts = [msg for msg in self.messages if msg.chart is not None]
+            for msg in charts[:max(0, len(charts) - self.chart_limit)]:
+                msg.chart = None
+
+    def _spill(self, message: ChatMessage):
+        self.spilled += 1
+        if not self.spill_path:
+            return
+        try:
+            directory = os.path.dirname(self.spill_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(message.to_dict(), ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.warning("대화 기록 보관 실패: %s", e)
+
+    @classmethod
+    def for_session(cls, config: "AssistantConfig") -> "ChatHistory":
+        spill_path = (os.path.join(config.history_spill_dir, f"{uuid.uuid4().hex}.jsonl")
+                      if config.history_spill_dir else None)
+        return cls(config.max_history_messages, config.max_chart_artifacts, spill_path)
+
+
+def fragment(fn):
+    """
+    fn을 Streamlit 프래그먼트로 만들어 그 안의 위젯을 조작할 때 fn만 다시 실행되게 합니다.
+    (구버전은 st.experimental_fragment, 둘 다 없으면 그대로 사용)
+    """
+    decorator = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    return decorator(fn) if decorator is not None else fn
+
+
+def run_query(assistant: Assistant, query: str):
+    """
+    비동기 파이프라인으로 질의를 처리하면서, 분류 결과가 나오는 즉시 화면에 표시합니다.
+    파이프라인은 프로세스 공유 이벤트 루프(BackgroundLoop)에서 실행하고, 단계별 결과를 큐로 받아 이 스레드에서 그립니다.
+    """
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    events: "queue.Queue[Union[dict, None]]" = queue.Queue()
+
+    async def produce():
+        script_run_ctx_var().set(ctx)  # 이 작업(Task)에만 적용
+        try:
+            async for event in assistant.astream_query(query):
+                events.put(event)
+        finally:
+            events.put(None)
+
+    BackgroundLoop.shared().submit(produce())
+    status = st.status("🔎 질의 분석 중...")
+    while True:
+        event = events.get()
+        if event is None:
+            return None
+        if event["stage"] == "classified":
+            status.update(label=f"🔎 {event['action']}: {event['search_keyword'] or '-'}")
+        elif event["stage"] == "result":
+            status.update(state="complete")
+            return event["action"], event["response"]
+        else:
+            status.update(state="error")
+            st.error(event["message"])
+            return event["message"]
+
+
 def main_():
     if "action" not in st.session_state:
             st.session_state.action = None
@@ -519,98 +2797,133 @@ def main_():
     try:
         # streamlit 실행
         # 세션 상태 초기화
+        assistant = Assistant.shared()
         if "messages" not in st.session_state:
-            st.session_state.messages = []  # 대화 기록을 저장
+            st.session_state.messages = ChatHistory.for_session(assistant.config)  # 대화 기록을 저장
 
         # 대화 입력
         query = st.chat_input("Enter your message.")
         if query:
             # 사용자의 메시지를 기록
-            st.session_state.messages.append({"role": "user", "content": query})
+            st.session_state.messages.append(ChatMessage("user", content=query))
 
-            assistant = Assistant.from_env()
-            if assistant.process_query(query):
-                action, response = assistant.process_query(query)
+            # chat_input은 제출 직후 한 번만 값을 돌려주므로 제출마다 한 번 처리 (다음 실행에는 action/keyword가 이어짐)
+            result = run_query(assistant, query)
+
+            if isinstance(result, tuple):
+                action, response = result
                 st.session_state.action = action
                 st.session_state.keyword = response
                 if action == 'search_video':
                     # 챗봇의 응답을 기록
-                    st.session_state.messages.append(
-                        {"role": "assistant", "video": response})
+                    st.session_state.messages.append(ChatMessage("assistant", kind="video", videos=response or []))
                 elif action == 'not_supported':
                     # 챗봇의 응답을 기록
-                    st.session_state.messages.append(
-                        {"role": "assistant", "content": response, "type": action})
-
-        # 대화 기록 표시
-        print(st.session_state.messages)
-        for msg in st.session_state.messages:
-            with st.chat_message(msg["role"]):
-                if msg["role"] == "assistant" and msg.get("type") == "not_supported":
-                    st.write(msg["content"])
-                    st.write("---")  # 구분선 추가
-
-                if "video" in msg:
-                    for video in msg['video']:
-                        # 두 개의 열 생성
-                        col1, col2 = st.columns([4,3])  # col1: 동영상, col2: 상세 정보 (비율 조정 가능)
-
-                        # 왼쪽 열에 동영상 표시
-                        with col1:
-                            st.video(video['url'])
-
-                        # 오른쪽 열에 상세 정보 표시
-                        with col2:
-                            st.write(f"**{video['title']}**")
-                            st.write(f"📹 채널: {video['channel']}")
-                            st.write(f"🗓️ 게시일: {video['published_at']}")
-                            st.write(f"👁️ 조회수: {video['view_count']:,}회")
-                            st.write(f"👍 좋아요: {video['like_count']:,}명")
-                            st.write(f"⛓️ [유튜브 링크]({video['url']})")
-
-                        st.write("---")  # 구분선 추가
-
-                elif 'plot' in msg:
-                    st.pyplot(msg['plot'])
-                    st.write(f"**⚽ 선택된 시즌 ID**: {msg['season']}")
-                    st.write(f"**🥅 매치 타입**: {msg['match']}")
-                    st.write("---")  # 구분선 추가
-
-                elif 'content' in msg and 'type' not in msg:  # content 키가 있는 경우
-                    st.write(msg["content"])
+                    st.session_state.messages.append(ChatMessage("assistant", kind=action, content=response))
+
+        # 대화 기록 표시 (보관 수를 넘은 오래된 메시지는 표시하지 않음)
+        history = st.session_state.messages
+        if history.spilled:
+            st.caption(f"(이전 대화 {history.spilled}개는 화면에 표시하지 않습니다)")
+        for msg in history:
+            render_message(msg)
 
     except Exception as e:
-        print(f"오류 발생: {e}")
+        logger.exception("화면 처리 중 오류 발생: %s", e)
 
-def main__(keyword):
-    assistant = Assistant.from_env()  # 인스턴스를 생성
 
-    # GET 요청으로 JSON 데이터 가져오기(시즌 id 데이터)
-    response = requests.get(assistant.seasonid_url)
-    response.raise_for_status()  # 요청 실패 시 예외 발생
-    seasonid_data = response.json()  # JSON 데이터를 파싱
+def render_message(msg: ChatMessage):
+    """
+    대화 기록 한 건을 표시합니다.
+    """
+    with st.chat_message(msg.role):
+        if msg.kind == "not_supported":
+            st.write(msg.content)
+            st.write("---")  # 구분선 추가
+
+        elif msg.kind == "video":
+            for video in msg.videos:
+                # 두 개의 열 생성
+                col1, col2 = st.columns([4,3])  # col1: 동영상, col2: 상세 정보 (비율 조정 가능)
+
+                # 왼쪽 열에 동영상 표시
+                with col1:
+                    st.video(video['url'])
+
+                # 오른쪽 열에 상세 정보 표시
+                with col2:
+                    st.write(f"**{video['title']}**")
+                    st.write(f"📹 채널: {video['channel']}")
+                    st.write(f"🗓️ 게시일: {video['published_at']}")
+                    st.write(f"👁️ 조회수: {video['view_count']:,}회")
+                    st.write(f"👍 좋아요: {video['like_count']:,}명")
+                    st.write(f"⛓️ [유튜브 링크]({video['url']})")
+
+                st.write("---")  # 구분선 추가
+
+        elif msg.kind == "chart":
+            if msg.chart is not None:
+                st.image(msg.chart)
+            else:
+                st.caption("(오래된 그래프는 보관하지 않습니다)")
+            st.markdown(msg.summary)
+            st.write(f"**⚽ 선택된 시즌 ID**: {msg.season}")
+            st.write(f"**🥅 매치 타입**: {msg.match}")
+            st.write("---")  # 구분선 추가
+
+        else:
+            st.write(msg.content)
+
+
+@fragment
+def main__(keyword):
+    """
+    시즌/매치 선택과 통계 결과 표시
+    프래그먼트로 실행되므로 선택 상자를 바꿔도 위의 대화 기록은 다시 그리지 않습니다.
+    """
+    assistant = Assistant.shared()  # 프로세스 공유 인스턴스
 
-    # GET 요청으로 JSON 데이터 가져오기(매치 데이터)
-    response = requests.get(assistant.match_url)
-    response.raise_for_status()  # 요청 실패 시 예외 발생
-    match_data = response.json()  # JSON 데이터를 파싱
+    # 시즌 id / 매치 메타데이터 (캐시에서 가져옴)
+    seasonid_data = assistant.metadata.get(assistant.seasonid_url)
+    match_data = assistant.metadata.get(assistant.match_url)
 
     response = assistant.additional_input(keyword, seasonid_data, match_data)  # 인스턴스를 통해 호출
-    if type(response)=='str':
+    if isinstance(response, str):
         st.write(response)
-        st.session_state.messages.append({"role": "assistant", "content": response})
+        st.session_state.messages.append(ChatMessage("assistant", content=response))
     elif response:
-        st.pyplot(response)
+        st.image(response.png)
+        st.markdown(response.summary)
         st.write(f"**⚽ 선택된 시즌 ID**: {st.session_state.selected_season}")
         st.write(f"**🥅 매치 타입**: {st.session_state.selected_match}")
-        st.session_state.messages.append({"role": "assistant", "plot": response,
-                                        "season": st.session_state.selected_season, "match": st.session_state.selected_match})
+        st.session_state.messages.append(ChatMessage(
+            "assistant", kind="chart", chart=response.png, summary=response.summary,
+            season=st.session_state.selected_season, match=st.session_state.selected_match))
+
+
+def show_debug_panel():
+    """
+    사이드바에 계측 지표(단계별 소요 시간, 외부 API 호출, 토큰 사용량, 캐시 적중률)를 표시합니다.
+    """
+    with st.sidebar.expander("🛠️ 계측 지표"):
+        st.json(metrics().snapshot())
 
 
 def main():
+    # 공유 인스턴스를 먼저 만들어 메타데이터/연결 풀을 미리 준비
+    assistant = Assistant.shared()
     main_()
-    if st.session_state.action == 'additional_input':
+    if st.session_state.action in ('additional_input', 'compare_stats'):
         main__(st.session_state.keyword)
+    elif st.session_state.get("prefetch_job") is not None:
+        # 통계 질의가 끝났으면 남은 미리 조회 취소
+        assistant.cancel_prefetch(st.session_state.prefetch_job["futures"])
+        st.session_state.prefetch_job = None
+    if assistant.config.debug_panel:
+        show_debug_panel()
+
+
+record_startup_timing("module_load", time.perf_counter() - _MODULE_STARTED)
 
 
 # 스크립트가 직접 실행될 때만 main() 함수 호출